@@ -3,12 +3,20 @@ import os
 
 CONFIG_DIR = os.path.dirname(__file__)
 CONFIG_FILE = os.path.join(CONFIG_DIR, "config.ini")
+PERFORMANCE_SECTION = "database.performance"
 
 DEFAULTS = {
     "database": {
         "backup_path": os.path.join(CONFIG_DIR, "db", "backups"),
         "backup_keep_count": "20",
-    }
+    },
+    PERFORMANCE_SECTION: {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": "-65536",
+        "mmap_size": "268435456",
+        "temp_store": "MEMORY",
+    },
 }
 
 def load_config() -> dict:
@@ -1,8 +1,8 @@
-import os
+import sqlite3
 import tkinter as tk
 import tkinter.ttk as ttk
 
-from db.database import DataBase
+from db.database import DataBase, DB_PATH
 from gui.constants import (
     GEOMETRY_W,
     GEOMETRY_H,
@@ -20,13 +20,6 @@ from gui.pages.statistics import StatPage
 from gui.pages.best_worst import BestWorst
 
 
-DB_PATH = os.path.join(
-    os.path.dirname(__file__),
-    "db",
-    "darts_data.db"
-)
-
-
 class DartsApp(tk.Tk):
     """Main application class"""
 
@@ -37,6 +30,7 @@ class DartsApp(tk.Tk):
         self.setup_database()
         self.create_pages()
         self.create_sidemenu()
+        self.after_idle(self.offer_session_recovery)
         # Run
         self.mainloop()
 
@@ -70,7 +64,7 @@ class DartsApp(tk.Tk):
         self.statpage.grid(row=0, column=1, sticky="news")
         self.bestworst = BestWorst(self, self.db)
         self.bestworst.grid(row=0, column=1, sticky="news")
-        self.settings = Settings(self)
+        self.settings = Settings(self, self.db)
         self.settings.grid(row=0, column=1, sticky="news")
         self.dashboard.tkraise()
 
@@ -93,6 +87,80 @@ class DartsApp(tk.Tk):
                          style="Menu.TFrame")
         self.menu.grid(row=0, column=0, sticky="news")
 
+    def offer_session_recovery(self) -> None:
+        """Ask what to do with every session that was not finished, e.g.
+        because the application crashed or was killed. One of them can be
+        continued, the others can be finished, discarded or kept for later.
+        A session is finished at the time of its last visit, sessions
+        without visits are discarded without asking"""
+        resumed = False
+        finished = False
+        for (game_id, game_start, game_type,
+             visits, last_visit) in self.db.get_unfinished_sessions():
+            if visits == 0:
+                choice = "discard"
+            else:
+                choice = self._ask_session_recovery(game_start, visits, not resumed)
+            try:
+                if choice == "continue":
+                    self._recover_session(game_id, game_start, game_type)
+                    resumed = True
+                elif choice == "finish":
+                    self.db.complete_session(game_id, last_visit or game_start)
+                    finished = True
+                elif choice == "discard":
+                    self.db.discard_session(game_id)
+            except sqlite3.Error as e:
+                CustomPopup(
+                    popup_type="error",
+                    title="Error",
+                    message=f"Failed to {choice} the session!\n{e}"
+                )
+        if finished:
+            try:
+                self.db.refresh_snapshot()
+            except OSError as e:
+                CustomPopup(
+                    popup_type="warning",
+                    title="Warning",
+                    message=f"Failed to refresh the snapshot of the history!\n{e}"
+                )
+
+    def _ask_session_recovery(self, game_start, visits: int, can_resume: bool) -> str:
+        """Ask what to do with an unfinished session. Return "continue",
+        "finish", "discard" or "keep" (leave it in the database)"""
+        choice = ["keep"]
+
+        def choose(action: str):
+            """Return a button callback that records action"""
+            return lambda: choice.__setitem__(0, action)
+
+        message = (f"The session started at {str(game_start)[:16]} "
+                   f"({visits} visits) was not finished.\n")
+        if can_resume:
+            message += "Continue it, finish it as it is, or discard its visits?"
+            extra_buttons = {"Finish": choose("finish"), "Discard": choose("discard")}
+            ok_text, callback_fct = "Continue", choose("continue")
+        else:
+            message += "Finish it as it is, or discard its visits?"
+            extra_buttons = {"Discard": choose("discard")}
+            ok_text, callback_fct = "Finish", choose("finish")
+        CustomPopup(
+            popup_type="question",
+            title="Unfinished Session",
+            message=message,
+            ok_text=ok_text,
+            cancel_text="Keep",
+            extra_buttons=extra_buttons,
+            callback_fct=callback_fct,
+        )
+        return choice[0]
+
+    def _recover_session(self, game_id: int, game_start, game_type: str) -> None:
+        """Load an unfinished session into the Scoring page and show it"""
+        self.scoring.resume_session(game_id, game_start, game_type)
+        self.scoring.tkraise()
+
     def close_app(self) -> None:
         """Show messagebox to confirm to quit, then close application"""
         CustomPopup(
@@ -104,6 +172,9 @@ class DartsApp(tk.Tk):
 
     def _shutdown(self) -> None:
         """Clean up resources and quit the application"""
+        # Let running backups finish, so no partial backup file is left
+        for backup_job in list(self.scoring.buttons_frame.backup_jobs):
+            backup_job.join()
         self.db.close_connection()
         self.quit()
 
@@ -0,0 +1,79 @@
+"""Database maintenance commands, usable without starting the GUI.
+
+Usage: python -m db <command> [--db PATH]
+"""
+import argparse
+
+from db.database import DataBase, DB_PATH
+from db.importer import FILE_FORMATS, SessionImporter, detect_format, read_rows
+from db.snapshot import snapshot_path_for
+
+
+def rebuild_stats(db: DataBase, args: argparse.Namespace) -> None:
+    """Recalculate the daily_stats rollup from the full history"""
+    db.rebuild_daily_stats()
+    print("daily_stats rebuilt.")
+
+
+def import_sessions(db: DataBase, args: argparse.Namespace) -> None:
+    """Import historical sessions from a CSV or JSON Lines file"""
+    file_format = args.format or detect_format(args.file)
+
+    def report_error(line_nr: int, reason: str) -> None:
+        print(f"Skipped line {line_nr}: {reason}")
+
+    importer = SessionImporter(db, chunk_size=args.chunk_size,
+                               on_error=report_error)
+    stats = importer.import_rows(read_rows(args.file, file_format,
+                                           on_error=importer.report_invalid))
+    print(f"Imported {stats.visits} visits in {stats.games} games, "
+          f"skipped {stats.skipped} rows.")
+    print(f"Took {stats.seconds:.1f} s ({stats.rows_per_second:,.0f} rows/s).")
+
+
+def export_snapshot(db: DataBase, args: argparse.Namespace) -> None:
+    """Create or refresh the columnar snapshot of the history"""
+    nr_of_games = db.refresh_snapshot(create=True)
+    print(f"Exported {nr_of_games} new games to "
+          f"{snapshot_path_for(db.db_path)}.")
+
+
+def create_parser() -> argparse.ArgumentParser:
+    """Create the command line parser with one subparser per command"""
+    parser = argparse.ArgumentParser(prog="python -m db",
+                                     description="DartsApp database tools")
+    parser.add_argument("--db", default=DB_PATH,
+                        help="path of the database (default: %(default)s)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild_parser = commands.add_parser(
+        "rebuild-stats", help="rebuild the daily statistics rollup")
+    rebuild_parser.set_defaults(handler=rebuild_stats)
+
+    import_parser = commands.add_parser(
+        "import", help="import historical sessions from CSV or JSON Lines")
+    import_parser.add_argument("file", help="file to import")
+    import_parser.add_argument("--format", choices=FILE_FORMATS,
+                               help="file format (default: from extension)")
+    import_parser.add_argument("--chunk-size", type=int, default=10000,
+                               help="visits per transaction (default: %(default)s)")
+    import_parser.set_defaults(handler=import_sessions)
+
+    snapshot_parser = commands.add_parser(
+        "snapshot", help="create or refresh the columnar (.npy) snapshot")
+    snapshot_parser.set_defaults(handler=export_snapshot)
+    return parser
+
+
+def main() -> None:
+    """Parse the command line and run the selected command"""
+    args = create_parser().parse_args()
+    db = DataBase(args.db)
+    try:
+        args.handler(db, args)
+    finally:
+        db.close_connection()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import os
+import queue
+import sqlite3
+import threading
+from datetime import datetime
+from glob import glob
+from pathlib import Path
+from typing import Callable, Optional
+
+
+class BackupJob(threading.Thread):
+    """Worker thread that copies a live database with the SQLite online
+    backup API, then removes the oldest backups above keep_count.
+
+    The worker never touches the GUI. Progress and completion events are
+    put on a queue and dispatched to the callbacks by poll(), which has to
+    be called periodically from the Tk loop (e.g. with after())."""
+
+    PAGES_PER_STEP = 256
+
+    def __init__(self, db_path: str, backup_path: str, keep_count: int,
+                 on_progress: Optional[Callable[[int, int], None]] = None,
+                 on_done: Optional[Callable[[bool, str], None]] = None) -> None:
+        """Construct the backup job. Call start() to run it in the
+        background or run() to run it on the calling thread."""
+        super().__init__(daemon=True)
+        self.db_path = db_path
+        self.backup_path = backup_path
+        self.keep_count = keep_count
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.success = False
+        self.message = ""
+        self._events: queue.Queue = queue.Queue()
+
+    def run(self) -> None:
+        """Copy the database page batch by page batch and apply retention"""
+        try:
+            backup_full_path = self._backup_database()
+            self._remove_old_backups()
+            self.success = True
+            self.message = backup_full_path
+        except (OSError, sqlite3.Error) as e:
+            self.success = False
+            self.message = f"Error during backup: {e}"
+        self._events.put(("done", self.success, self.message))
+
+    def poll(self) -> bool:
+        """Dispatch queued events to the callbacks on the calling thread.
+        Return True while the job has not reported completion yet."""
+        while True:
+            try:
+                event = self._events.get_nowait()
+            except queue.Empty:
+                return True
+            if event[0] == "progress":
+                if self.on_progress:
+                    self.on_progress(event[1], event[2])
+            else:
+                if self.on_done:
+                    self.on_done(event[1], event[2])
+                return False
+
+    def _backup_database(self) -> str:
+        """Write the backup to a temporary file, rename it when complete.
+        Return the path of the backup file"""
+        os.makedirs(self.backup_path, exist_ok=True)
+
+        # Create backup filename with timestamp, with microseconds, so two
+        # backups started in the same second do not write the same file
+        current_datetime = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        db_stem = Path(self.db_path).stem
+        backup_file = f"{db_stem}_{current_datetime}.db"
+        backup_full_path = os.path.join(self.backup_path, backup_file)
+        partial_path = backup_full_path + ".part"
+
+        try:
+            source = sqlite3.connect(self.db_path)
+            try:
+                target = sqlite3.connect(partial_path)
+                try:
+                    source.backup(target, pages=self.PAGES_PER_STEP,
+                                  progress=self._report_progress)
+                finally:
+                    target.close()
+            finally:
+                source.close()
+            os.replace(partial_path, backup_full_path)
+        except (OSError, sqlite3.Error):
+            # Do not leave an incomplete backup behind, retention only
+            # removes complete ones
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            raise
+        return backup_full_path
+
+    def _remove_old_backups(self) -> None:
+        """Keep only the newest keep_count backups"""
+        db_stem = Path(self.db_path).stem
+        pattern = os.path.join(self.backup_path, f"{db_stem}_*.db")
+        backups = sorted(glob(pattern))
+        while len(backups) > self.keep_count:
+            os.remove(backups.pop(0))
+
+    def _report_progress(self, status: int, remaining: int, total: int) -> None:
+        """Progress callback of sqlite3.Connection.backup"""
+        self._events.put(("progress", total - remaining, total))
+
+
+if __name__ == "__main__":
+    pass
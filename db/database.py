@@ -1,18 +1,77 @@
 import sqlite3
 import os
-from datetime import datetime
-from pathlib import Path
-from shutil import copy
-from typing import Optional
-from glob import glob
+import threading
+from time import perf_counter
+from typing import Callable, Optional
 
 import pandas as pd
 import config
+from db.backup import BackupJob
+from db.metric_series import MetricSeries
+from db.query_cache import QueryCache, read_sql_file
+from db.snapshot import Snapshot, snapshot_path_for
+from engine.darts import dart_value, encode_dart, is_treble
+from engine.session import SessionRecords
 
-SQL_SCRIPT_PATH = os.path.join(
-    os.path.dirname(os.path.dirname(__file__)), 
-    "sql", 
-    "db_initialize.sql")
+DB_PATH = os.path.join(
+    os.path.dirname(__file__),
+    "darts_data.db")
+
+MIGRATIONS_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)),
+    "sql",
+    "migrations")
+
+REBUILD_DAILY_STATS_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)),
+    "sql",
+    "rebuild_daily_stats.sql")
+
+DAILY_METRICS_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)),
+    "sql",
+    "daily_metrics.sql")
+
+DAILY_METRICS_SINCE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)),
+    "sql",
+    "daily_metrics_since.sql")
+
+DAILY_METRICS_CHECKSUM_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)),
+    "sql",
+    "daily_metrics_checksum.sql")
+
+DAILY_METRICS_COLUMNS = [
+    "nr_of_games",
+    "visits",
+    "overall_score",
+    "darts_thrown",
+    "visits_180",
+    "trebleless",
+]
+
+UPSERT_DAILY_STATS = (
+    "INSERT INTO daily_stats "
+    "(date, games, visits, score_sum, visits_180, trebleless) "
+    "VALUES (?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (date) DO UPDATE SET "
+    "games = games + excluded.games, "
+    "visits = visits + excluded.visits, "
+    "score_sum = score_sum + excluded.score_sum, "
+    "visits_180 = visits_180 + excluded.visits_180, "
+    "trebleless = trebleless + excluded.trebleless"
+)
+
+def _get_migrations() -> list:
+    """Return the numbered migration scripts as (version, path) tuples
+    in ascending order. Files are named like 0001_description.sql"""
+    migrations = []
+    for file_name in os.listdir(MIGRATIONS_PATH):
+        version, _, _ = file_name.partition("_")
+        if file_name.endswith(".sql") and version.isdigit():
+            migrations.append((int(version), os.path.join(MIGRATIONS_PATH, file_name)))
+    return sorted(migrations)
 
 def _get_backup_path() -> str:
     """Return the configured backup path, falling back to a portable default."""
@@ -37,17 +96,81 @@ def _get_backup_keep_count() -> int:
         keep_count = int(config.DEFAULTS["database"]["backup_keep_count"])
     return max(1, keep_count)
 
+# Allowed values of the connection tuning pragmas. Integer valued pragmas
+# are listed with None, they are validated by conversion.
+PERFORMANCE_PRAGMAS = {
+    "journal_mode": ("DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"),
+    "synchronous": ("OFF", "NORMAL", "FULL", "EXTRA"),
+    "cache_size": None,
+    "mmap_size": None,
+    "temp_store": ("DEFAULT", "FILE", "MEMORY"),
+}
+
+def _get_performance_settings() -> dict:
+    """Return the configured connection pragmas. Invalid values are
+    replaced by the defaults."""
+    cfg = config.load_config()
+    defaults = config.DEFAULTS[config.PERFORMANCE_SECTION]
+    settings = {}
+    for pragma, allowed_values in PERFORMANCE_PRAGMAS.items():
+        raw_value = cfg.get(config.PERFORMANCE_SECTION, pragma,
+                            fallback=defaults[pragma]).strip().upper()
+        if allowed_values is None:
+            try:
+                raw_value = str(int(raw_value))
+            except ValueError:
+                raw_value = defaults[pragma]
+        elif raw_value not in allowed_values:
+            raw_value = defaults[pragma]
+        settings[pragma] = raw_value
+    return settings
+
+# Lowest synchronous level of the connection that writes the visits.
+# In WAL mode NORMAL only survives a crash of the process, a commit can
+# be lost on power loss
+DURABLE_SYNCHRONOUS = "FULL"
+
+VISIT_180_CODES = (encode_dart("T20"), encode_dart("T19"))
+
+def _daily_stats_delta(game_start, records: list, new_game: bool = True) -> tuple:
+    """Return the daily_stats row a session adds to the day it started on.
+    records = [(dart_1, dart_2, dart_3, sum), ...] with integer dart codes
+    new_game = False, when the records continue an already counted game"""
+    visits_180, trebleless, score_sum = 0, 0, 0
+    for dart_1, dart_2, dart_3, total in records:
+        score_sum += total
+        if dart_1 == dart_2 == dart_3 and dart_1 in VISIT_180_CODES:
+            visits_180 += 1
+        if not (is_treble(dart_1) or is_treble(dart_2) or is_treble(dart_3)):
+            trebleless += 1
+    # Works for datetime objects and for the stored "YYYY-MM-DD ..." text
+    date = str(game_start)[:10]
+    return (date, int(new_game), len(records), score_sum, visits_180, trebleless)
+
 class DataBase():
     """Class for handling darts score database"""
 
     def __init__(self, db_path: str) -> None:
-        """Initialize database and get last game id"""
+        """Connect to the database and bring its schema up to date"""
         self.db_path = db_path
+        self.last_save_ms = 0.0
+        # Counts the commits of this connection, PRAGMA data_version
+        # only reflects the commits of other connections
+        self.write_count = 0
+        # Changes of PRAGMA data_version seen by any thread, see
+        # get_data_version
+        self.external_changes = 0
+        self.query_cache = QueryCache()
+        self.metric_series = MetricSeries()
+        # Worker threads read through connections of their own, sqlite3
+        # connections can not be shared between threads
+        self._owner_thread = threading.get_ident()
+        self._thread_local = threading.local()
+        self._reader_conns: list = []
+        self._reader_lock = threading.Lock()
         self.db_conn = self.create_connection()
-        with self.db_conn:
-            with open(SQL_SCRIPT_PATH, "r") as sql_script_file:
-                sql_script = sql_script_file.read()
-                self.db_initialize(sql_script)
+        self._make_durable(self.db_conn)
+        self.migrate()
 
     def __del__(self) -> None:
         """Ensure connection is closed if object is garbage collected"""
@@ -62,72 +185,222 @@ class DataBase():
             return 0
         return game_id
 
-    def create_connection(self) -> sqlite3.Connection:
+    def create_connection(self, check_same_thread: bool = True) -> sqlite3.Connection:
         """Create an sqlite3 connection with the database"""
-        db_conn = sqlite3.connect(self.db_path)
+        db_conn = sqlite3.connect(self.db_path, check_same_thread=check_same_thread)
         db_conn.execute("PRAGMA foreign_keys = ON")
+        # Values are validated against PERFORMANCE_PRAGMAS, so they can
+        # be formatted into the statements safely
+        for pragma, value in _get_performance_settings().items():
+            db_conn.execute(f"PRAGMA {pragma} = {value}")
         return db_conn
+
+    def _make_durable(self, db_conn: sqlite3.Connection) -> None:
+        """Raise the synchronous level of the connection to at least
+        DURABLE_SYNCHRONOUS, so its commits survive a power loss"""
+        levels = PERFORMANCE_PRAGMAS["synchronous"]
+        level = db_conn.execute("PRAGMA synchronous").fetchone()[0]
+        if level < levels.index(DURABLE_SYNCHRONOUS):
+            db_conn.execute(f"PRAGMA synchronous = {DURABLE_SYNCHRONOUS}")
+
+    def get_performance_settings(self) -> dict:
+        """Return the connection pragmas currently in effect"""
+        cursor = self.db_conn.cursor()
+        settings = {}
+        for pragma, allowed_values in PERFORMANCE_PRAGMAS.items():
+            value = cursor.execute(f"PRAGMA {pragma}").fetchone()[0]
+            # synchronous and temp_store are reported as their index
+            if allowed_values is not None and isinstance(value, int):
+                value = allowed_values[value]
+            settings[pragma] = str(value).upper()
+        return settings
     
+    def reader_connection(self) -> sqlite3.Connection:
+        """Return the connection for queries of the calling thread: the
+        main connection on the thread that created the DataBase, a
+        connection of its own on any other thread"""
+        if threading.get_ident() == self._owner_thread:
+            return self.db_conn
+        db_conn = getattr(self._thread_local, "db_conn", None)
+        if db_conn is None:
+            # Closed by close_connection, which may run on another thread
+            db_conn = self.create_connection(check_same_thread=False)
+            self._thread_local.db_conn = db_conn
+            with self._reader_lock:
+                self._reader_conns.append(db_conn)
+        return db_conn
+
     def close_connection(self) -> None:
-        """Close the database connection"""
+        """Close the database connection and those of the worker threads"""
         if self.db_conn:
             self.db_conn.close()
             self.db_conn = None
+        with self._reader_lock:
+            for db_conn in self._reader_conns:
+                db_conn.close()
+            self._reader_conns.clear()
 
-    def db_initialize(self, sql_script: str) -> None:
-        """Initialize the database using the provided sql script"""
-        cursor = self.db_conn.cursor()
-        cursor.executescript(sql_script)
-        self.db_conn.commit()
+    def execute_script_atomically(self, sql_script: str) -> None:
+        """Run a multi-statement sql script in a single transaction.
+        Nothing is changed if any of the statements fails"""
+        try:
+            self.db_conn.executescript(f"BEGIN;\n{sql_script}\nCOMMIT;")
+        except sqlite3.Error:
+            if self.db_conn.in_transaction:
+                self.db_conn.rollback()
+            raise
+        self.write_count += 1
 
-    def insert_game(self, record: tuple) -> None:
-        """Insert game into games table"""
-        # TODO: document how the record tuple should look like
-        cursor = self.db_conn.cursor()
-        cursor.execute(
-            "INSERT INTO games VALUES (?, ?, ?, ?)",
-            (*record, )
+    def get_schema_version(self) -> int:
+        """Get the schema version stored in the database"""
+        return self.db_conn.execute("PRAGMA user_version").fetchone()[0]
+
+    def migrate(self) -> int:
+        """Apply the migration scripts newer than the schema version of the
+        database, each one in its own transaction. Return the new version"""
+        schema_version = self.get_schema_version()
+        for version, migration_path in _get_migrations():
+            if version <= schema_version:
+                continue
+            with open(migration_path, "r") as migration_file:
+                sql_script = migration_file.read()
+            self.execute_script_atomically(
+                f"{sql_script}\nPRAGMA user_version = {version};"
             )
-        self.db_conn.commit()
+            schema_version = version
+        return schema_version
 
-    def insert_data(self, record: tuple) -> None:
-        """Insert scoring data into throws table.
-        record = (game_id, throw_1, throw_2, throw_3, sum)"""
-        cursor = self.db_conn.cursor()
-        cursor.execute(
-            "INSERT INTO throws (game_id, throw_1, throw_2, throw_3, sum) "
-            "VALUES (?, ?, ?, ?, ?)",
-            (*record, )
+    def load_session(self, game_id: int) -> SessionRecords:
+        """Load the visits of a game into a session model, e.g. for review"""
+        cursor = self.db_conn.execute(
+            "SELECT dart_1, dart_2, dart_3 FROM throws "
+            "WHERE game_id = ? ORDER BY throw_id",
+            (game_id, )
             )
-        self.db_conn.commit()
+        return SessionRecords.from_rows(cursor)
 
-    def backup_database(self) -> bool:
-        """Create a copy of the db with a timestamp in the filename in the 
-        folder defined in configuration
-        Return True if backup was successful, False otherwise"""
-        try:
-            backup_path = _get_backup_path()
-            keep_count = _get_backup_keep_count()
+    def begin_session(self, game_start, game_type: str) -> int:
+        """Insert the game row of a session in progress, without game end.
+        The id is taken while the write lock is held, so other writers
+        (e.g. an import) can not take the same one. Return the game id"""
+        with self.db_conn:
+            cursor = self.db_conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            game_id = (cursor.execute(
+                "SELECT MAX(game_id) FROM games").fetchone()[0] or 0) + 1
+            cursor.execute(
+                "INSERT INTO games VALUES (?, ?, NULL, ?)",
+                (game_id, game_start, game_type)
+                )
+        self.write_count += 1
+        return game_id
+
+    def append_visit(self, game_id: int, codes: tuple, thrown_at) -> None:
+        """Store one visit of a session in progress as soon as it is entered.
+        codes = (dart_1, dart_2, dart_3) integer dart codes"""
+        with self.db_conn:
+            self.db_conn.execute(
+                "INSERT INTO throws (game_id, dart_1, dart_2, dart_3, sum, thrown_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (game_id, *codes, sum(dart_value(code) for code in codes), thrown_at)
+                )
+        self.write_count += 1
+
+    def update_visit(self, game_id: int, visit_index: int, codes: tuple) -> None:
+        """Overwrite the darts of an edited visit of a session in progress.
+        visit_index is the 0-based position of the visit in the game"""
+        with self.db_conn:
+            self.db_conn.execute(
+                "UPDATE throws SET dart_1 = ?, dart_2 = ?, dart_3 = ?, sum = ? "
+                "WHERE throw_id = (SELECT throw_id FROM throws WHERE game_id = ? "
+                "ORDER BY throw_id LIMIT 1 OFFSET ?)",
+                (*codes, sum(dart_value(code) for code in codes),
+                 game_id, visit_index)
+                )
+        self.write_count += 1
 
-            # Ensure backup directory exists
-            os.makedirs(backup_path, exist_ok=True)
+    def complete_session(self, game_id: int, game_end) -> float:
+        """Mark a session in progress as finished and add it to the
+        daily_stats rollup in one transaction, its visits are stored
+        already by append_visit, so the write does not grow with the
+        length of the session.
+        Return the duration of the write in milliseconds."""
+        started = perf_counter()
+        with self.db_conn:
+            cursor = self.db_conn.cursor()
+            game_start = cursor.execute(
+                "SELECT game_start FROM games WHERE game_id = ? AND game_end IS NULL",
+                (game_id, )
+                ).fetchone()
+            if game_start is None:
+                raise sqlite3.IntegrityError(f"No unfinished game with id {game_id}")
+            records = cursor.execute(
+                "SELECT dart_1, dart_2, dart_3, sum FROM throws WHERE game_id = ?",
+                (game_id, )
+                ).fetchall()
+            cursor.execute(
+                "UPDATE games SET game_end = ? WHERE game_id = ?",
+                (game_end, game_id)
+                )
+            cursor.execute(UPSERT_DAILY_STATS,
+                           _daily_stats_delta(game_start[0], records))
+        self.write_count += 1
+        self.last_save_ms = (perf_counter() - started) * 1000
+        return self.last_save_ms
 
-            # Create backup filename with timestamp            
-            current_datetime = datetime.now().strftime("%Y%m%d_%H%M%S")
-            db_stem = Path(self.db_path).stem
-            backup_file = f"{db_stem}_{current_datetime}.db"
-            backup_full_path = os.path.join(backup_path, backup_file)
-            copy(self.db_path, backup_full_path)
+    def discard_session(self, game_id: int) -> None:
+        """Delete a session in progress together with its visits"""
+        with self.db_conn:
+            self.db_conn.execute(
+                "DELETE FROM games WHERE game_id = ? AND game_end IS NULL",
+                (game_id, )
+                )
+        self.write_count += 1
 
-            pattern = os.path.join(backup_path, f"{db_stem}_*.db")
-            backups = sorted(glob(pattern))
-            while len(backups) > keep_count:
-                os.remove(backups.pop(0))
-            return True
+    def get_unfinished_sessions(self) -> list:
+        """Return the sessions that were never finished, e.g. because the
+        application crashed, newest first. last_visit is the time of the
+        last visit, None if there is none or it was saved without time.
+        [(game_id, game_start, type, visits, last_visit), ...]"""
+        cursor = self.db_conn.execute(
+            "SELECT games.game_id, games.game_start, games.type, "
+            "COUNT(throws.throw_id), MAX(throws.thrown_at) FROM games "
+            "LEFT JOIN throws ON games.game_id = throws.game_id "
+            "WHERE games.game_end IS NULL "
+            "GROUP BY games.game_id ORDER BY games.game_id DESC"
+            )
+        return cursor.fetchall()
 
-        except OSError as e:
-            print(f"Error during backup: {e}")
-            return False
+    def rebuild_daily_stats(self) -> None:
+        """Recalculate the daily_stats rollup from the full history"""
+        with open(REBUILD_DAILY_STATS_PATH, "r") as sql_script_file:
+            sql_script = sql_script_file.read()
+        self.execute_script_atomically(sql_script)
+
+    def refresh_snapshot(self, create: bool = False) -> int:
+        """Export the games saved since the last refresh to the columnar
+        snapshot of the history. Nothing is done if there is no snapshot,
+        unless create is True. Return the number of exported games"""
+        snapshot = Snapshot(snapshot_path_for(self.db_path))
+        if not (create or snapshot.exists()):
+            return 0
+        return snapshot.refresh(self.db_conn)
+
+    def create_backup_job(
+        self,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+        on_done: Optional[Callable[[bool, str], None]] = None,
+    ) -> BackupJob:
+        """Create a backup job for the db that writes a copy with a timestamp
+        in the filename to the folder defined in configuration.
+        The job has to be started by the caller."""
+        return BackupJob(
+            self.db_path,
+            _get_backup_path(),
+            _get_backup_keep_count(),
+            on_progress=on_progress,
+            on_done=on_done,
+        )
 
     def query_to_dataframe_raw(
         self,
@@ -138,22 +411,85 @@ class DataBase():
         """Execute a raw SQL query and return the result as a DataFrame."""
         return pd.read_sql_query(
             sql,
-            self.db_conn,
+            self.reader_connection(),
             params=params,
             parse_dates=parse_dates,
         )
 
+    def get_data_version(self) -> tuple:
+        """Return a token that changes whenever the database content changes,
+        either through this connection or through any other one.
+        PRAGMA data_version is counted per connection, so every thread
+        compares it with the value its connection reported last, and a
+        change is counted in a counter shared by all threads"""
+        db_conn = self.reader_connection()
+        data_version = db_conn.execute("PRAGMA data_version").fetchone()[0]
+        if getattr(self._thread_local, "data_version", None) != data_version:
+            self._thread_local.data_version = data_version
+            with self._reader_lock:
+                self.external_changes += 1
+        return (self.external_changes, self.write_count)
+
     def query_to_dataframe(
         self,
         sql_path: str,
         params: Optional[tuple] = None,
         parse_dates: Optional[dict] = None,
     ) -> pd.DataFrame:
-        """Execute a SQL script file and return the result as a DataFrame."""
-        with open(sql_path, "r") as query_file:
-            sql = query_file.read()
-        return self.query_to_dataframe_raw(sql, params=params, parse_dates=parse_dates)
+        """Execute a SQL script file and return the result as a DataFrame.
+        Results are cached until the database content changes."""
+        sql = read_sql_file(sql_path)
+        key = QueryCache.make_key(sql, params, parse_dates)
+        version = self.get_data_version()
+        df = self.query_cache.get(key, version)
+        if df is None:
+            df = self.query_to_dataframe_raw(sql, params=params, parse_dates=parse_dates)
+            self.query_cache.put(key, version, df)
+        return df
+
+    def daily_metrics(self, sampling_rule: Optional[str] = None) -> pd.DataFrame:
+        """Return every per-day metric in one frame, indexed by date, or
+        resampled by sampling_rule (e.g. "D", "MS", "YS").
+        Columns are listed in DAILY_METRICS_COLUMNS and are all int64.
+        The frames are kept in memory, see db.metric_series"""
+        with self.metric_series.lock:
+            version = self.get_data_version()
+            if self.metric_series.version != version:
+                self._sync_metric_series(version)
+            return self.metric_series.level(sampling_rule)
+
+    def _sync_metric_series(self, version: tuple) -> None:
+        """Bring the in-memory daily metrics up to date. If the days
+        before the last loaded one are unchanged, only the days from
+        that one on are loaded again"""
+        series = self.metric_series
+        since = series.last_date()
+        if since is not None:
+            since_text = since.strftime("%Y-%m-%d")
+            checksum = self.reader_connection().execute(
+                read_sql_file(DAILY_METRICS_CHECKSUM_PATH), (since_text, )
+            ).fetchone()
+            if tuple(checksum) == series.checksum_before(since):
+                tail = self._read_daily_metrics(DAILY_METRICS_SINCE_PATH, (since_text, ))
+                series.replace_tail(since, tail, version)
+                return
+        series.load(self._read_daily_metrics(DAILY_METRICS_PATH), version)
+
+    def _read_daily_metrics(self, sql_path: str,
+                            params: Optional[tuple] = None) -> pd.DataFrame:
+        """Run a daily metrics query through the query cache and return
+        its frame indexed by date"""
+        df = self.query_to_dataframe(
+            sql_path,
+            params=params,
+            parse_dates={"date": {"format": "%Y-%m-%d"}},
+        )
+        df = df.set_index("date")
+        return df[DAILY_METRICS_COLUMNS].astype("int64")
 
+    def cache_info(self) -> dict:
+        """Return hit/miss statistics of the query result cache"""
+        return self.query_cache.info()
 
 if __name__ == "__main__":
     pass
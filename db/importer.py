@@ -0,0 +1,202 @@
+"""Streaming import of historical sessions from CSV or JSON Lines files.
+
+Every row is one visit with the fields:
+    session  - key of the session in the file, rows of a session
+               must be consecutive
+    start    - start of the session, ISO format (e.g. 2021-03-14 18:30)
+    end      - end of the session, optional, defaults to start
+    type     - game type, optional, defaults to Scoring
+    throw_1, throw_2, throw_3 - darts, validated like the score entries
+
+Rows are read one by one and written in chunks, each chunk in its own
+transaction, so memory use does not depend on the size of the file."""
+import csv
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from time import perf_counter
+from typing import Callable, Iterable, Iterator, Optional
+
+from db.database import DataBase, UPSERT_DAILY_STATS, _daily_stats_delta
+from engine.darts import lookup_dart
+
+FILE_FORMATS = ("csv", "jsonl")
+
+
+@dataclass
+class ImportStats:
+    """Counters of an import run"""
+    visits: int = 0
+    games: int = 0
+    skipped: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        """Imported visits per second"""
+        if self.seconds <= 0:
+            return 0.0
+        return self.visits / self.seconds
+
+
+@dataclass
+class _PendingGame:
+    """A game with the visits read since the last chunk was written.
+    game_id is None until the game row is inserted"""
+    key: str
+    start: datetime
+    end: datetime
+    game_type: str
+    game_id: Optional[int] = None
+    records: list = field(default_factory=list)
+
+
+def detect_format(path: str) -> str:
+    """Return the file format of path by its extension, csv if unknown"""
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    return "jsonl" if extension in ("jsonl", "json") else "csv"
+
+
+def read_rows(path: str, file_format: str,
+              on_error: Optional[Callable[[int, str], None]] = None
+              ) -> Iterator[tuple[int, dict]]:
+    """Yield (line number, row) pairs from a CSV or JSON Lines file.
+    JSON lines that can not be decoded to an object are skipped, on_error
+    is called with their line number and the reason"""
+    with open(path, "r", newline="", encoding="utf-8") as import_file:
+        if file_format == "csv":
+            reader = csv.DictReader(import_file)
+            for row in reader:
+                yield (reader.line_num, row)
+        elif file_format == "jsonl":
+            for line_nr, line in enumerate(import_file, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    if on_error:
+                        on_error(line_nr, f"Invalid JSON: {e}")
+                    continue
+                if not isinstance(row, dict):
+                    if on_error:
+                        on_error(line_nr, "Invalid JSON: not an object")
+                    continue
+                yield (line_nr, row)
+        else:
+            raise ValueError(f"Unknown file format: {file_format}")
+
+
+def _parse_visit(row: dict) -> tuple:
+    """Validate one row and return its visit as
+    (dart_1, dart_2, dart_3, sum) with integer dart codes.
+    Raise ValueError if the row is not valid"""
+    visit_darts = [lookup_dart(str(row[column]))
+                   for column in ("throw_1", "throw_2", "throw_3")]
+    return (*(dart.code for dart in visit_darts),
+            sum(dart.value for dart in visit_darts))
+
+
+class SessionImporter():
+    """Write a stream of visit rows to the database in chunked transactions"""
+
+    def __init__(self, db: DataBase, chunk_size: int = 10000,
+                 on_error: Optional[Callable[[int, str], None]] = None) -> None:
+        """Construct the importer. on_error is called with the line number
+        and the reason of every skipped row"""
+        self.db = db
+        self.chunk_size = chunk_size
+        self.on_error = on_error
+        self.stats = ImportStats()
+        self._games: list[_PendingGame] = []
+        self._chunk_visits = 0
+
+    def import_rows(self, rows: Iterable[tuple[int, dict]]) -> ImportStats:
+        """Import all rows and return the counters of the run"""
+        started = perf_counter()
+        for line_nr, row in rows:
+            try:
+                self._add_row(row)
+            except (KeyError, TypeError, ValueError) as e:
+                self.report_invalid(line_nr, str(e))
+                continue
+            if self._chunk_visits >= self.chunk_size:
+                self._write_chunk()
+        self._write_chunk()
+        self.stats.seconds = perf_counter() - started
+        return self.stats
+
+    def report_invalid(self, line_nr: int, reason: str) -> None:
+        """Count a skipped row and report it to on_error. Also usable as
+        the on_error of read_rows"""
+        self.stats.skipped += 1
+        if self.on_error:
+            self.on_error(line_nr, reason)
+
+    def _add_row(self, row: dict) -> None:
+        """Validate a row and add its visit to the current chunk"""
+        visit = _parse_visit(row)
+        key = str(row["session"])
+        if not self._games or self._games[-1].key != key:
+            start = datetime.fromisoformat(str(row["start"]))
+            end = row.get("end")
+            self._games.append(_PendingGame(
+                key=key,
+                start=start,
+                end=datetime.fromisoformat(str(end)) if end else start,
+                game_type=row.get("type") or "Scoring",
+            ))
+        self._games[-1].records.append(visit)
+        self._chunk_visits += 1
+
+    def _write_chunk(self) -> None:
+        """Insert the current chunk in one transaction. New games get their
+        ids while the write lock is held, so concurrent writers can not
+        take the same ids"""
+        if self._chunk_visits == 0:
+            return
+        db_conn = self.db.db_conn
+        daily_deltas: dict[str, list] = {}
+        with db_conn:
+            cursor = db_conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            next_game_id = (cursor.execute(
+                "SELECT MAX(game_id) FROM games").fetchone()[0] or 0) + 1
+            new_games = []
+            throws = []
+            for game in self._games:
+                new_game = game.game_id is None
+                if new_game:
+                    game.game_id = next_game_id
+                    next_game_id += 1
+                    new_games.append(
+                        (game.game_id, game.start, game.end, game.game_type))
+                throws.extend((game.game_id, *record) for record in game.records)
+                date, *delta = _daily_stats_delta(game.start, game.records, new_game)
+                totals = daily_deltas.setdefault(date, [0] * len(delta))
+                for i, value in enumerate(delta):
+                    totals[i] += value
+            cursor.executemany("INSERT INTO games VALUES (?, ?, ?, ?)", new_games)
+            cursor.executemany(
+                "INSERT INTO throws (game_id, dart_1, dart_2, dart_3, sum) "
+                "VALUES (?, ?, ?, ?, ?)",
+                throws
+                )
+            cursor.executemany(
+                UPSERT_DAILY_STATS,
+                [(date, *totals) for date, totals in daily_deltas.items()]
+                )
+        self.db.write_count += 1
+        self.stats.games += len(new_games)
+        self.stats.visits += len(throws)
+
+        # Only the last game can continue in the next chunk
+        last_game = self._games[-1]
+        last_game.records = []
+        self._games = [last_game]
+        self._chunk_visits = 0
+
+
+if __name__ == "__main__":
+    pass
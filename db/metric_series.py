@@ -0,0 +1,115 @@
+"""Multi-resolution in-memory copy of the per-day metrics.
+
+The daily base frame is loaded once. The levels of the sampling rules of
+the plots (e.g. "D", "MS", "YS") are resampled from it on first use and
+kept. When days are added or changed at the end of the history, e.g.
+after a session was saved, only the trailing days are replaced and only
+the trailing bucket of every level is resampled again.
+
+The class does not query the database, DataBase.daily_metrics decides
+whether the whole base or only its tail has to be loaded."""
+import threading
+from typing import Hashable, Optional
+
+import numpy as np
+import pandas as pd
+
+NS_PER_DAY = 86_400 * 10**9
+
+# Columns of the checksum, same order as sql/daily_metrics_checksum.sql
+CHECKSUM_COLUMNS = ["nr_of_games", "visits", "overall_score", "visits_180",
+                    "trebleless"]
+
+
+def bucket_start(date: pd.Timestamp, sampling_rule: str) -> pd.Timestamp:
+    """Return the start of the bucket of sampling_rule containing date"""
+    offset = pd.tseries.frequencies.to_offset(sampling_rule)
+    return offset.rollback(pd.Timestamp(date).normalize())
+
+
+class MetricSeries():
+    """Daily metrics and their resampled levels, indexed by date.
+    The frames handed out are copies, so callers can change them"""
+
+    def __init__(self) -> None:
+        """Construct an empty series, load() has to be called first"""
+        self.version: Optional[Hashable] = None
+        self.base: Optional[pd.DataFrame] = None
+        self.levels: dict = {}
+        self.full_loads = 0
+        self.tail_loads = 0
+        # Held by DataBase while the series is checked and updated
+        self.lock = threading.RLock()
+
+    @property
+    def loaded(self) -> bool:
+        """True once the base frame is loaded"""
+        return self.base is not None
+
+    def last_date(self) -> Optional[pd.Timestamp]:
+        """Return the last day of the base frame, None if it is empty"""
+        if self.base is None or self.base.empty:
+            return None
+        return self.base.index[-1]
+
+    def checksum_before(self, date: pd.Timestamp) -> tuple:
+        """Return the checksum of the days before date, computed like
+        sql/daily_metrics_checksum.sql"""
+        head = self.base[self.base.index < date]
+        days = head.index.asi8 // NS_PER_DAY
+        weights = head[CHECKSUM_COLUMNS].sum(axis=1).to_numpy(dtype=np.int64)
+        return (len(head),
+                *(int(head[column].sum()) for column in CHECKSUM_COLUMNS),
+                int(np.dot(weights, days)))
+
+    def load(self, base: pd.DataFrame, version: Hashable) -> None:
+        """Replace the whole base frame and drop the levels"""
+        self.base = base.sort_index()
+        self.levels = {}
+        self.version = version
+        self.full_loads += 1
+
+    def replace_tail(self, since: pd.Timestamp, tail: pd.DataFrame,
+                     version: Hashable) -> None:
+        """Replace the days from since on with tail and resample the
+        buckets of the levels that contain them"""
+        head = self.base[self.base.index < since]
+        self.base = pd.concat([head, tail.sort_index()])
+        for sampling_rule, level in self.levels.items():
+            self.levels[sampling_rule] = self._resample_tail(level, sampling_rule, since)
+        self.version = version
+        self.tail_loads += 1
+
+    def level(self, sampling_rule: Optional[str] = None) -> pd.DataFrame:
+        """Return the base frame (sampling_rule None) or its level
+        resampled by sampling_rule"""
+        if sampling_rule is None:
+            return self.base.copy()
+        level = self.levels.get(sampling_rule)
+        if level is None:
+            level = self.base.resample(sampling_rule).sum()
+            self.levels[sampling_rule] = level
+        return level.copy()
+
+    def _resample_tail(self, level: pd.DataFrame, sampling_rule: str,
+                       since: pd.Timestamp) -> pd.DataFrame:
+        """Return level with the buckets from the one containing since on
+        resampled from the base frame"""
+        start = bucket_start(since, sampling_rule)
+        head = level[level.index < start]
+        tail = self.base[self.base.index >= start]
+        if tail.empty:
+            return head
+        tail = tail.resample(sampling_rule).sum()
+        if not head.empty:
+            # Buckets without days between the kept and the new buckets
+            gap = pd.date_range(head.index[-1], tail.index[0], freq=sampling_rule,
+                                name=tail.index.name)[1:-1]
+            if len(gap):
+                tail = pd.concat([pd.DataFrame(0, index=gap, columns=tail.columns,
+                                               dtype="int64"), tail])
+        return pd.concat([head, tail])
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,79 @@
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Hashable, Optional
+
+import pandas as pd
+
+
+@lru_cache(maxsize=64)
+def read_sql_file(sql_path: str) -> str:
+    """Read an sql script file once and keep its text in memory"""
+    with open(sql_path, "r") as query_file:
+        return query_file.read()
+
+
+class QueryCache():
+    """Bounded LRU cache of query results.
+
+    Every entry belongs to a database version. When the version passed to
+    get() differs from the one of the stored entries, the whole cache is
+    dropped, so a result is never served after the data has changed."""
+
+    def __init__(self, max_entries: int = 32) -> None:
+        """Construct an empty cache holding at most max_entries results"""
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._version: Optional[Hashable] = None
+        self._results: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(sql: str, params: Optional[tuple],
+                 parse_dates: Optional[dict]) -> tuple:
+        """Build a hashable cache key from the query arguments"""
+        return (sql, tuple(params) if params else None, repr(parse_dates))
+
+    def get(self, key: tuple, version: Hashable) -> Optional[pd.DataFrame]:
+        """Return a copy of the cached result, or None on a miss"""
+        with self._lock:
+            if version != self._version:
+                self._results.clear()
+                self._version = version
+            result = self._results.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._results.move_to_end(key)
+            self.hits += 1
+            return result.copy()
+
+    def put(self, key: tuple, version: Hashable, result: pd.DataFrame) -> None:
+        """Store a result, evicting the least recently used one if full"""
+        with self._lock:
+            if version != self._version:
+                return
+            self._results[key] = result.copy()
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached results"""
+        with self._lock:
+            self._results.clear()
+
+    def info(self) -> dict:
+        """Return the hit/miss counters and the current number of entries"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._results),
+                "max_entries": self.max_entries,
+            }
+
+
+if __name__ == "__main__":
+    pass
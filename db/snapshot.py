@@ -0,0 +1,169 @@
+"""Columnar snapshot of the games and throws history.
+
+Every column is stored as its own .npy file, so analyses can memory-map
+the history with numpy.load(..., mmap_mode="r") instead of converting
+the rows of a query one by one. The files are extended in place, only
+the games saved since the last refresh are exported.
+
+The .npy headers are written with a fixed size, so the row count in the
+header can be updated after appending without moving the data. A
+manifest file stores the row counts and the last exported game id. It
+is replaced only after all columns were written, so an interrupted
+refresh is rolled back by the next one."""
+import json
+import os
+import struct
+
+import numpy as np
+import pandas as pd
+
+MANIFEST_FILE = "manifest.json"
+HEADER_SIZE = 128
+
+# Table -> column -> dtype
+COLUMNS = {
+    "games": {
+        "game_id": np.dtype("<i8"),
+        "game_start": np.dtype("<M8[us]"),
+        "game_end": np.dtype("<M8[us]"),
+    },
+    "throws": {
+        "throw_id": np.dtype("<i8"),
+        "game_id": np.dtype("<i8"),
+        "dart_1": np.dtype("u1"),
+        "dart_2": np.dtype("u1"),
+        "dart_3": np.dtype("u1"),
+        "sum": np.dtype("<i2"),
+    },
+}
+
+
+def _npy_header(dtype: np.dtype, length: int) -> bytes:
+    """Return a version 1.0 .npy header of HEADER_SIZE bytes"""
+    header = repr({
+        "descr": np.lib.format.dtype_to_descr(dtype),
+        "fortran_order": False,
+        "shape": (length,),
+    })
+    # magic (6) + version (2) + header length (2) + header + "\n"
+    header = header.ljust(HEADER_SIZE - 10 - 1) + "\n"
+    return (np.lib.format.MAGIC_PREFIX + bytes([1, 0])
+            + struct.pack("<H", len(header)) + header.encode("latin1"))
+
+
+class Snapshot():
+    """Columnar .npy snapshot of the history, stored in a folder"""
+
+    def __init__(self, path: str) -> None:
+        """Construct the snapshot stored in the folder at path"""
+        self.path = path
+
+    def exists(self) -> bool:
+        """Return True if the snapshot was created already"""
+        return os.path.exists(self._manifest_path())
+
+    def refresh(self, db_conn) -> int:
+        """Append the games (and their throws) saved since the last refresh.
+        Create the snapshot if it does not exist. Return the nr of new games"""
+        manifest = self._read_manifest()
+        last_game_id = manifest["last_game_id"]
+        # Stop before the first session in progress, its game and throws
+        # are exported once it is finished
+        games = db_conn.execute(
+            "SELECT game_id, game_start, game_end FROM games "
+            "WHERE game_id > ? AND game_id < COALESCE("
+            "(SELECT MIN(game_id) FROM games WHERE game_end IS NULL), ?) "
+            "ORDER BY game_id",
+            (last_game_id, 2**63 - 1)
+            ).fetchall()
+        os.makedirs(self.path, exist_ok=True)
+        if games:
+            throws = db_conn.execute(
+                "SELECT throw_id, game_id, dart_1, dart_2, dart_3, sum FROM throws "
+                "WHERE game_id > ? AND game_id <= ? ORDER BY game_id, throw_id",
+                (last_game_id, games[-1][0])
+                ).fetchall()
+            self._append_table("games", games, manifest)
+            self._append_table("throws", throws, manifest)
+            manifest["last_game_id"] = games[-1][0]
+        self._write_manifest(manifest)
+        return len(games)
+
+    def load(self) -> dict:
+        """Return the snapshot as {table: {column: memory-mapped array}}"""
+        manifest = self._read_manifest()
+        tables = {}
+        for table, columns in COLUMNS.items():
+            length = manifest["rows"][table]
+            tables[table] = {}
+            for column in columns:
+                column_path = self._column_path(table, column)
+                if not os.path.exists(column_path):
+                    tables[table][column] = np.empty(0, dtype=columns[column])
+                    continue
+                # Ignore rows of an interrupted refresh
+                tables[table][column] = np.load(column_path, mmap_mode="r")[:length]
+        return tables
+
+    def to_dataframe(self, table: str) -> pd.DataFrame:
+        """Return one table of the snapshot as a DataFrame"""
+        return pd.DataFrame(self.load()[table], copy=False)
+
+    def _append_table(self, table: str, rows: list, manifest: dict) -> None:
+        """Append rows to the column files of a table"""
+        length = manifest["rows"][table]
+        for i, (column, dtype) in enumerate(COLUMNS[table].items()):
+            values = [row[i] for row in rows]
+            if dtype.kind == "M":
+                # Stored as "YYYY-MM-DD HH:MM:SS[.ffffff]" text
+                values = [str(value).replace(" ", "T") if value else "NaT"
+                          for value in values]
+            data = np.asarray(values, dtype=dtype)
+            self._append_column(self._column_path(table, column),
+                                dtype, length, data)
+        manifest["rows"][table] = length + len(rows)
+
+    @staticmethod
+    def _append_column(column_path: str, dtype: np.dtype, length: int,
+                       data: np.ndarray) -> None:
+        """Write data after the first length rows of a column file,
+        then update the row count in its header"""
+        mode = "r+b" if os.path.exists(column_path) else "w+b"
+        with open(column_path, mode) as column_file:
+            column_file.seek(HEADER_SIZE + length * dtype.itemsize)
+            column_file.truncate()
+            column_file.write(data.tobytes())
+            column_file.seek(0)
+            column_file.write(_npy_header(dtype, length + len(data)))
+
+    def _read_manifest(self) -> dict:
+        """Return the manifest, or an empty one if there is no snapshot"""
+        if not self.exists():
+            return {"last_game_id": 0, "rows": {table: 0 for table in COLUMNS}}
+        with open(self._manifest_path(), "r") as manifest_file:
+            return json.load(manifest_file)
+
+    def _write_manifest(self, manifest: dict) -> None:
+        """Replace the manifest atomically"""
+        temp_path = self._manifest_path() + ".tmp"
+        with open(temp_path, "w") as manifest_file:
+            json.dump(manifest, manifest_file)
+        os.replace(temp_path, self._manifest_path())
+
+    def _manifest_path(self) -> str:
+        """Return the path of the manifest file"""
+        return os.path.join(self.path, MANIFEST_FILE)
+
+    def _column_path(self, table: str, column: str) -> str:
+        """Return the path of the .npy file of a column"""
+        return os.path.join(self.path, f"{table}_{column}.npy")
+
+
+def snapshot_path_for(db_path: str) -> str:
+    """Return the snapshot folder of a database, next to the db file"""
+    db_dir, db_file = os.path.split(db_path)
+    return os.path.join(db_dir, f"{os.path.splitext(db_file)[0]}_snapshot")
+
+
+if __name__ == "__main__":
+    pass
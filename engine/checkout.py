@@ -0,0 +1,160 @@
+"""Precomputed checkout and setup suggestions for X01 double-out games.
+
+The tables are built once at import by dynamic programming over the
+darts of engine.darts, so a suggestion is a single tuple lookup:
+    CHECKOUTS[darts][remaining] - the route that finishes remaining with
+        at most darts darts, ending on a double (or the bullseye), or
+        None if it can not be finished
+    SETUPS[remaining] - the three darts that leave the best finish, for
+        scores that can not be finished with one visit
+
+Routes with fewer darts are preferred, equal ones are ranked by the
+preference cost of their darts: T20 and T19 for scoring, and the doubles
+that can be split into further doubles (D20, D16, D8, ...) to finish."""
+from typing import NamedTuple, Optional
+
+from engine.darts import DART_TABLE, Dart
+
+MAX_DARTS = 3
+MAX_REMAINING = 501
+MAX_CHECKOUT = 170
+
+# Preference cost of the finishing doubles by segment, others cost 4
+DOUBLE_COSTS = {20: 0, 16: 0, 8: 1, 18: 1, 12: 1, 10: 1, 4: 2, 2: 2,
+                14: 2, 6: 2, 25: 5}
+
+
+class Suggestion(NamedTuple):
+    """Darts to aim at with the next visit"""
+    darts: tuple
+    is_checkout: bool
+
+
+def _scoring_cost(dart: Dart) -> int:
+    """Preference cost of a dart that is not the finishing one"""
+    if dart.is_treble:
+        return {20: 0, 19: 1, 18: 2, 17: 2}.get(dart.segment, 3)
+    if dart.is_bull:
+        return 4
+    if dart.is_double:
+        return 3
+    return 1
+
+
+def _finishing_cost(dart: Dart) -> int:
+    """Preference cost of a finishing double"""
+    return DOUBLE_COSTS.get(dart.segment, 4)
+
+
+def _in_throwing_order(tokens: tuple) -> tuple:
+    """Sort the darts of a route by preference, e.g. T20 first"""
+    return tuple(sorted(tokens, key=lambda token: (
+        _scoring_cost(DART_TABLE[token]), -DART_TABLE[token].value)))
+
+
+# Every scoring dart once, aliases and darts without a score excluded
+SCORING_DARTS = tuple(sorted(
+    {dart for dart in DART_TABLE.values() if dart.value > 0},
+    key=lambda dart: (_scoring_cost(dart), -dart.value),
+))
+FINISHING_DARTS = tuple(dart for dart in SCORING_DARTS if dart.is_double)
+
+
+def _build_checkouts() -> tuple:
+    """Return CHECKOUTS, the best routes indexed by darts and remaining.
+    A route of n darts is a scoring dart followed by the best route of
+    n - 1 darts for the rest, so every level only looks one dart ahead"""
+    # best[r] = (number of darts, cost, route) of the best route for r
+    best = [None] * (MAX_CHECKOUT + 1)
+    for dart in FINISHING_DARTS:
+        candidate = (1, _finishing_cost(dart), (dart.token, ))
+        if best[dart.value] is None or candidate < best[dart.value]:
+            best[dart.value] = candidate
+    levels = [(None, ) * (MAX_REMAINING + 1), list(best)]
+    for _ in range(2, MAX_DARTS + 1):
+        previous = levels[-1]
+        current = list(previous)
+        for remaining in range(2, MAX_CHECKOUT + 1):
+            for dart in SCORING_DARTS:
+                rest = remaining - dart.value
+                if rest < 2 or previous[rest] is None:
+                    continue
+                darts, cost, route = previous[rest]
+                candidate = (darts + 1, cost + _scoring_cost(dart),
+                             (*_in_throwing_order((dart.token, *route[:-1])),
+                              route[-1]))
+                if current[remaining] is None or candidate < current[remaining]:
+                    current[remaining] = candidate
+        levels.append(current)
+    return tuple(
+        tuple(entry[2] if entry else None for entry in level)
+        + (None, ) * (MAX_REMAINING - len(level) + 1)
+        for level in levels
+    )
+
+
+CHECKOUTS = _build_checkouts()
+
+
+def _build_setups() -> tuple:
+    """Return SETUPS, the best three-dart visits for every remaining score
+    without a one-visit checkout. The best visit per visit total is built
+    first (181 totals), then every remaining score picks the total with
+    the best leave: a leave that is finished with fewer darts, then with
+    a preferred double, then the highest total"""
+    # visits[total] = (cost, route) of the preferred three darts
+    visits = {0: (0, ())}
+    for _ in range(MAX_DARTS):
+        next_visits = {}
+        for total, (cost, route) in visits.items():
+            for dart in SCORING_DARTS:
+                candidate = (cost + _scoring_cost(dart),
+                             _in_throwing_order((*route, dart.token)))
+                key = total + dart.value
+                if key not in next_visits or candidate < next_visits[key]:
+                    next_visits[key] = candidate
+        visits = next_visits
+
+    def leave_rank(leave: int) -> tuple:
+        """Rank of the score left after the setup visit, lower is better.
+        The finishing double only counts for leaves of one or two darts,
+        otherwise scoring more is preferred"""
+        route = CHECKOUTS[MAX_DARTS][leave] if leave <= MAX_CHECKOUT else None
+        if route is None:
+            return (MAX_DARTS + 1, 0)
+        if len(route) == MAX_DARTS:
+            return (MAX_DARTS, 0)
+        return (len(route), _finishing_cost(DART_TABLE[route[-1]]))
+
+    setups = [None] * (MAX_REMAINING + 1)
+    for remaining in range(2, MAX_REMAINING + 1):
+        if CHECKOUTS[MAX_DARTS][remaining] is not None:
+            continue
+        candidates = [
+            (leave_rank(remaining - total), -total, cost, route)
+            for total, (cost, route) in visits.items()
+            if remaining - total >= 2
+        ]
+        if candidates:
+            setups[remaining] = min(candidates)[3]
+    return tuple(setups)
+
+
+SETUPS = _build_setups()
+
+
+def suggest(remaining: int, darts: int = MAX_DARTS) -> Optional[Suggestion]:
+    """Return the suggestion for remaining with darts darts left,
+    or None if there is nothing to suggest"""
+    if not 2 <= remaining <= MAX_REMAINING:
+        return None
+    route = CHECKOUTS[darts][remaining]
+    if route is not None:
+        return Suggestion(route, True)
+    if darts == MAX_DARTS and SETUPS[remaining] is not None:
+        return Suggestion(SETUPS[remaining], False)
+    return None
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,160 @@
+"""Dart lookup table and compact integer encoding of single darts.
+
+A dart is stored as one small integer: multiplier * 32 + segment, where
+segment is 1-20 or 25 (bull) and multiplier is 1 (single), 2 (double) or
+3 (treble). Entries without a score are 0 (no score), 30 (B, bouncer) and
+31 (R, robin hood). The value of a dart is (code & 31) * (code >> 5).
+The same encoding is used by the darts table of the database.
+
+DART_TABLE is built once at import and maps every accepted entry to its
+Dart, so validation and conversion are a single dictionary lookup."""
+import re
+from types import MappingProxyType
+from typing import Mapping, NamedTuple
+
+SEGMENT_BITS = 5
+SEGMENT_MASK = (1 << SEGMENT_BITS) - 1
+MAX_CODE = (3 << SEGMENT_BITS) | SEGMENT_MASK
+
+BULL_SEGMENT = 25
+BOUNCER_CODE = 30
+ROBIN_HOOD_CODE = 31
+
+
+class Dart(NamedTuple):
+    """Properties of a single dart"""
+    code: int
+    token: str
+    value: int
+    segment: int
+    multiplier: int
+    is_treble: bool
+    is_double: bool
+    is_bull: bool
+
+
+def _make_dart(code: int, token: str) -> Dart:
+    """Create a Dart from its code and canonical token"""
+    multiplier, segment = code >> SEGMENT_BITS, code & SEGMENT_MASK
+    return Dart(
+        code=code,
+        token=token,
+        value=segment * multiplier,
+        segment=segment,
+        multiplier=multiplier,
+        is_treble=multiplier == 3,
+        is_double=multiplier == 2,
+        is_bull=segment == BULL_SEGMENT,
+    )
+
+
+def _build_dart_table() -> Mapping[str, Dart]:
+    """Build the table of valid score entries:
+        1-20 : singles,  D1-D20 : doubles,  T1-T20 : trebles
+           0 : no score
+          25 : single bull
+          50 : bullseye
+           B : bouncer
+           R : robin hood
+    + and * are accepted as aliases of D and T"""
+    table = {}
+    for segment in range(1, 21):
+        table[str(segment)] = _make_dart((1 << SEGMENT_BITS) + segment, str(segment))
+        double = _make_dart((2 << SEGMENT_BITS) + segment, f"D{segment}")
+        treble = _make_dart((3 << SEGMENT_BITS) + segment, f"T{segment}")
+        table[double.token] = table[f"+{segment}"] = double
+        table[treble.token] = table[f"*{segment}"] = treble
+    table["0"] = _make_dart(0, "0")
+    table["25"] = _make_dart((1 << SEGMENT_BITS) + BULL_SEGMENT, "25")
+    table["50"] = _make_dart((2 << SEGMENT_BITS) + BULL_SEGMENT, "50")
+    table["B"] = _make_dart(BOUNCER_CODE, "B")
+    table["R"] = _make_dart(ROBIN_HOOD_CODE, "R")
+    return MappingProxyType(table)
+
+
+DART_TABLE = _build_dart_table()
+
+# Accepted score entries (upper case), membership test is a hash lookup
+VALID_ENTRIES = DART_TABLE
+
+# Darts indexed by code, None for unused codes
+DARTS_BY_CODE = tuple(
+    next((dart for dart in DART_TABLE.values() if dart.code == code), None)
+    for code in range(MAX_CODE + 1)
+)
+DART_VALUES = tuple(dart.value if dart else 0 for dart in DARTS_BY_CODE)
+
+DARTS_PER_VISIT = 3
+
+
+def _build_quick_entry_table() -> Mapping[str, Dart]:
+    """Build the table of quick entry tokens: every entry of DART_TABLE,
+    S1-S20 and S25 for singles, D25 for the bullseye, and the values
+    21-60 of doubles and trebles, e.g. 60 -> T20, 38 -> D19.
+    A value that is both (24, 30, 36) is taken as the treble,
+    the D prefix selects the double"""
+    table = dict(DART_TABLE)
+    for segment in range(1, 21):
+        table[f"S{segment}"] = DART_TABLE[str(segment)]
+    table["S25"] = DART_TABLE["25"]
+    table["D25"] = table["+25"] = DART_TABLE["50"]
+    for segment in range(11, 21):
+        table.setdefault(str(segment * 2), DART_TABLE[f"D{segment}"])
+    for segment in range(7, 21):
+        table[str(segment * 3)] = DART_TABLE[f"T{segment}"]
+    table["25"], table["50"] = DART_TABLE["25"], DART_TABLE["50"]
+    return MappingProxyType(table)
+
+
+QUICK_ENTRY_TABLE = _build_quick_entry_table()
+
+# Darts of a quick entry visit are separated by whitespace or commas
+_VISIT_TOKEN = re.compile(r"[^\s,]+")
+
+
+def lookup_dart(entry: str) -> Dart:
+    """Return the Dart of a score entry, e.g. "+5" -> Dart(code=69, token="D5", ...).
+    Raise ValueError if the entry is not a valid darts score"""
+    try:
+        return DART_TABLE[entry.strip().upper()]
+    except KeyError:
+        raise ValueError(f"Invalid darts score: {entry!r}") from None
+
+
+def parse_visit(text: str) -> tuple:
+    """Parse a whole visit typed into one field and return its three Darts.
+    For example "T20 T20 19" or "60, 60, 19" -> (T20, T20, 19).
+    Raise ValueError if it is not three valid darts"""
+    tokens = _VISIT_TOKEN.findall(text.upper())
+    if len(tokens) != DARTS_PER_VISIT:
+        raise ValueError(f"A visit needs {DARTS_PER_VISIT} darts: {text!r}")
+    try:
+        return tuple(QUICK_ENTRY_TABLE[token] for token in tokens)
+    except KeyError as e:
+        raise ValueError(f"Invalid darts score: {e.args[0]!r}") from None
+
+
+def encode_dart(token: str) -> int:
+    """Return the integer code of a dart token.
+    For example T20 -> 116, D5 -> 69, 7 -> 39, B -> 30"""
+    return DART_TABLE[token.upper()].code
+
+
+def decode_dart(code: int) -> str:
+    """Return the canonical text form of a dart code.
+    For example 116 -> T20, 69 -> D5, 39 -> 7, 30 -> B"""
+    return DARTS_BY_CODE[code].token
+
+
+def dart_value(code: int) -> int:
+    """Return the score of a dart code"""
+    return DART_VALUES[code]
+
+
+def is_treble(code: int) -> bool:
+    """Return True if the dart code is a treble"""
+    return code >> SEGMENT_BITS == 3
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,55 @@
+"""Downsampling of dense plot data to the resolution of the plot.
+
+lttb selects the points of a line with the largest-triangle-three-buckets
+algorithm: the first and the last point are kept, and every bucket in
+between keeps the point that spans the largest triangle with the point
+kept before and the mean of the next bucket. Peaks survive, flat
+stretches are thinned out.
+
+max_buckets merges neighbouring values, e.g. bars, into buckets and
+keeps the largest value of every bucket, so no peak is lost."""
+import numpy as np
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Return the indices of at most threshold points of x and y
+    (sorted by x) that keep the shape of the line"""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # Bucket edges of the points between the first and the last one
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0] = 0
+    selected = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_start = end
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        mean_x = x[next_start:next_end].mean()
+        mean_y = y[next_start:next_end].mean()
+        # Twice the triangle areas, the factor does not change the maximum
+        areas = np.abs((x[selected] - mean_x) * (y[start:end] - y[selected])
+                       - (x[selected] - x[start:end]) * (mean_y - y[selected]))
+        selected = start + int(np.argmax(areas))
+        indices[bucket + 1] = selected
+    indices[-1] = n - 1
+    return indices
+
+
+def max_buckets(values: np.ndarray, buckets: int) -> tuple:
+    """Merge values into at most buckets buckets of neighbours. Return
+    the size of a bucket and the largest value of every bucket"""
+    values = np.asarray(values, dtype=float)
+    if buckets < 1 or len(values) <= buckets:
+        return (1, values)
+    size = -(-len(values) // buckets)
+    padded = np.full(-(-len(values) // size) * size, -np.inf)
+    padded[:len(values)] = values
+    return (size, padded.reshape(-1, size).max(axis=1))
+
+
+if __name__ == "__main__":
+    pass
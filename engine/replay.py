@@ -0,0 +1,162 @@
+"""Replay driver: feed recorded or synthetic visits through the scoring
+engine, without the GUI, and report its throughput and latencies.
+
+Usage:
+    python -m engine.replay --visits 1000000 [--session-length 100]
+    python -m engine.replay --input history.csv [--format csv|jsonl]
+
+Recorded files use the import format of db.importer, only their visits
+are replayed, the sessions start at the time of the replay. The sessions
+are written to a temporary database, unless --db is given."""
+import argparse
+import os
+import random
+import tempfile
+from array import array
+from dataclasses import dataclass, field
+from itertools import groupby
+from time import perf_counter
+from typing import Iterable, Iterator
+
+from db.database import DataBase
+from db.importer import FILE_FORMATS, detect_format, read_rows
+from engine.darts import DARTS_BY_CODE, lookup_dart
+from engine.scoring import ScoringSession
+
+PERCENTILES = (50, 95, 99)
+
+
+@dataclass
+class ReplayReport:
+    """Counters and latencies of a replay run, latencies in milliseconds"""
+    visits: int = 0
+    sessions: int = 0
+    skipped: int = 0
+    seconds: float = 0.0
+    visit_latencies: array = field(default_factory=lambda: array("d"))
+    finish_latencies: array = field(default_factory=lambda: array("d"))
+
+    @property
+    def visits_per_second(self) -> float:
+        """Replayed visits per second"""
+        if self.seconds <= 0:
+            return 0.0
+        return self.visits / self.seconds
+
+
+def percentiles(latencies: Iterable[float]) -> dict:
+    """Return {percentile: value} of PERCENTILES and the maximum (100),
+    using the nearest rank method"""
+    values = sorted(latencies)
+    if not values:
+        return {percentile: 0.0 for percentile in (*PERCENTILES, 100)}
+    result = {}
+    for percentile in PERCENTILES:
+        rank = max(1, -(-percentile * len(values) // 100))
+        result[percentile] = values[rank - 1]
+    result[100] = values[-1]
+    return result
+
+
+def synthetic_sessions(visits: int, session_length: int,
+                       seed: int = None) -> Iterator[list]:
+    """Yield sessions of random visits, each a list of dart code tuples"""
+    rng = random.Random(seed)
+    codes = [dart.code for dart in DARTS_BY_CODE if dart is not None]
+    while visits > 0:
+        length = min(session_length, visits)
+        yield [tuple(rng.choices(codes, k=3)) for _ in range(length)]
+        visits -= length
+
+
+def recorded_sessions(path: str, file_format: str,
+                      report: ReplayReport) -> Iterator[list]:
+    """Yield the sessions of an import file, each a list of dart code
+    tuples. Invalid rows and lines are counted as skipped in report"""
+    def skip_line(line_nr: int, reason: str) -> None:
+        report.skipped += 1
+
+    rows = (row for _, row in read_rows(path, file_format, on_error=skip_line))
+    for _, session_rows in groupby(rows, key=lambda row: str(row.get("session"))):
+        visits = []
+        for row in session_rows:
+            try:
+                visits.append(tuple(lookup_dart(str(row[column])).code
+                                    for column in ("throw_1", "throw_2", "throw_3")))
+            except (KeyError, ValueError):
+                report.skipped += 1
+        if visits:
+            yield visits
+
+
+def replay(session: ScoringSession, sessions: Iterable[list],
+           report: ReplayReport) -> ReplayReport:
+    """Add the visits of every session to the scoring session and finish
+    it, timing every database write"""
+    started = perf_counter()
+    for visits in sessions:
+        for codes in visits:
+            visit_started = perf_counter()
+            session.add_visit(codes)
+            report.visit_latencies.append((perf_counter() - visit_started) * 1000)
+        finish_started = perf_counter()
+        session.finish()
+        report.finish_latencies.append((perf_counter() - finish_started) * 1000)
+        report.visits += len(visits)
+        report.sessions += 1
+    report.seconds = perf_counter() - started
+    return report
+
+
+def print_report(report: ReplayReport) -> None:
+    """Print the throughput and the latency percentiles of a run"""
+    print(f"Replayed {report.visits} visits in {report.sessions} sessions, "
+          f"skipped {report.skipped} rows.")
+    print(f"Took {report.seconds:.1f} s "
+          f"({report.visits_per_second:,.0f} visits/s).")
+    for name, latencies in (("visit save", report.visit_latencies),
+                            ("finish", report.finish_latencies)):
+        values = percentiles(latencies)
+        print(f"{name} latency (ms): " + ", ".join(
+            f"p{percentile} {value:.3f}" if percentile < 100 else f"max {value:.3f}"
+            for percentile, value in values.items()))
+
+
+def create_parser() -> argparse.ArgumentParser:
+    """Create the command line parser"""
+    parser = argparse.ArgumentParser(prog="python -m engine.replay",
+                                     description="Replay visits through the scoring engine")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", help="recorded sessions to replay (import format)")
+    source.add_argument("--visits", type=int, help="number of synthetic visits")
+    parser.add_argument("--format", choices=FILE_FORMATS,
+                        help="format of --input (default: from extension)")
+    parser.add_argument("--session-length", type=int, default=100,
+                        help="visits per synthetic session (default: %(default)s)")
+    parser.add_argument("--seed", type=int, help="seed of the synthetic visits")
+    parser.add_argument("--db", help="database to write to (default: a temporary one). "
+                                     "The replayed sessions are added to its history!")
+    return parser
+
+
+def main() -> None:
+    """Parse the command line and run the replay"""
+    args = create_parser().parse_args()
+    report = ReplayReport()
+    if args.input:
+        file_format = args.format or detect_format(args.input)
+        sessions = recorded_sessions(args.input, file_format, report)
+    else:
+        sessions = synthetic_sessions(args.visits, max(1, args.session_length), args.seed)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db = DataBase(args.db or os.path.join(temp_dir, "replay.db"))
+        try:
+            replay(ScoringSession(db), sessions, report)
+        finally:
+            db.close_connection()
+    print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""GUI-free scoring session: the visits of a game, their running
+statistics and their persistence.
+
+The database is passed in as an object with the session methods of
+db.database.DataBase (begin_session, append_visit, update_visit,
+complete_session, discard_session, load_session). Errors of the
+database (sqlite3.Error) are not handled here, the caller decides how
+to report them. The session model is only changed after the database
+write succeeded, so both stay in sync."""
+from datetime import datetime
+
+from engine.darts import lookup_dart
+from engine.session import SessionRecords, ThrowRecord
+from engine.statistics import (
+    DEFAULT_WINDOW_SIZE,
+    SessionStatistics,
+    WindowStatistics,
+)
+from engine.x01 import X01_START_SCORES, X01Leg
+
+# Types of games that can be played, stored in games.type
+GAME_TYPES = ("Scoring", *X01_START_SCORES)
+
+
+def convert_score(score: str) -> tuple:
+    """Convert score string to int. Return score string and score int
+    as a tuple.
+    For example T20 -> ("T20", 60) or D5 -> ("D5", 10)"""
+    dart = lookup_dart(str(score))
+    return (dart.token, dart.value)
+
+
+class Game():
+    """Class to contain game data"""
+    def __init__(self, game_id: int, game_type: str = "Scoring") -> None:
+        """Construct Game class"""
+        self.game_id = game_id
+        self.game_type = game_type
+        self.game_started = False
+        self.start = None
+        self.end = None
+
+    def initialize_game(self):
+        self.start = datetime.now()
+        self.game_started = True
+
+
+class ScoringSession():
+    """A scoring practice session or an X01 leg. The game is stored in
+    the database with its first visit, every visit is written as soon as
+    it is added or edited, and finish only marks the game as complete."""
+
+    def __init__(self, db, game_type: str = "Scoring",
+                 window_size: int = DEFAULT_WINDOW_SIZE) -> None:
+        """Construct an empty session that is stored in db. window_size is
+        the number of visits of the rolling average"""
+        self.db = db
+        self.game_type = game_type
+        self.records = SessionRecords()
+        self.stats = SessionStatistics()
+        self.windows = WindowStatistics(window_size)
+        self.x01 = self._new_leg()
+        self.game = self._new_game()
+        # OSError of the snapshot refresh of the last finish, if any
+        self.snapshot_error = None
+
+    def _new_game(self) -> Game:
+        """Return the game of the next session, its id is final once
+        the session is started"""
+        return Game(self.db.get_last_game_id() + 1, self.game_type)
+
+    def _new_leg(self):
+        """Return the X01 leg of the game type, None if it is not X01"""
+        if self.game_type in X01_START_SCORES:
+            return X01Leg(X01_START_SCORES[self.game_type])
+        return None
+
+    def set_game_type(self, game_type: str) -> None:
+        """Change the type of the next game, before it is started"""
+        if game_type not in GAME_TYPES:
+            raise ValueError(f"Unknown game type: {game_type}")
+        if self.started:
+            raise ValueError("The type of a started game can not be changed")
+        self.game_type = game_type
+        self.game.game_type = game_type
+        self.x01 = self._new_leg()
+
+    @property
+    def checked_out(self) -> bool:
+        """True if the X01 leg is finished"""
+        return self.x01 is not None and self.x01.checked_out
+
+    @property
+    def started(self) -> bool:
+        """True once the game is stored in the database"""
+        return self.game.game_started
+
+    def start(self) -> None:
+        """Start the game and store it as a session in progress"""
+        self.game.initialize_game()
+        try:
+            self.game.game_id = self.db.begin_session(self.game.start,
+                                                      self.game.game_type)
+        except Exception:
+            self.game.start = None
+            self.game.game_started = False
+            raise
+
+    def add_visit(self, codes: tuple) -> ThrowRecord:
+        """Store a visit of three dart codes and add it to the session.
+        Return its row view"""
+        if self.checked_out:
+            raise ValueError("The leg is checked out already")
+        if not self.started:
+            self.start()
+        self.db.append_visit(self.game.game_id, codes, datetime.now())
+        record = self.records.append(codes)
+        self.stats.add_visit(codes)
+        self.windows.add_visit(record.total)
+        if self.x01 is not None:
+            self.x01.add_visit(codes)
+        return record
+
+    def replace_dart(self, index: int, position: int, code: int) -> tuple:
+        """Store and apply the change of one dart (position 0-2) of the
+        visit at index. Return the dart codes before and after the change.
+        Raise ValueError if the change would finish an X01 leg before its
+        last visit"""
+        codes = list(self.records.codes(index))
+        codes[position] = code
+        self._check_leg_edit(index, tuple(codes))
+        self.db.update_visit(self.game.game_id, index, tuple(codes))
+        old_codes, new_codes = self.records.replace_dart(index, position, code)
+        self.stats.replace_visit(old_codes, new_codes)
+        self.windows.replace_visit(index, self.records.total(index))
+        self._rebuild_leg()
+        return (old_codes, new_codes)
+
+    def _check_leg_edit(self, index: int, codes: tuple) -> None:
+        """Raise ValueError if replacing the visit at index with codes
+        would check the X01 leg out before its last visit"""
+        if self.x01 is None:
+            return
+        leg = X01Leg(self.x01.start_score)
+        last_index = len(self.records) - 1
+        for visit_index in range(last_index):
+            leg.add_visit(codes if visit_index == index else self.records.codes(visit_index))
+            if leg.checked_out:
+                raise ValueError(
+                    f"The change would check the leg out in visit {visit_index + 1}, "
+                    "but later visits were thrown already")
+
+    def _rebuild_leg(self) -> None:
+        """Recalculate the X01 leg from the visits of the session"""
+        if self.x01 is not None:
+            self.x01.rebuild(self.records.codes(index)
+                             for index in range(len(self.records)))
+
+    def finish(self) -> float:
+        """Mark the game as complete and prepare the next session.
+        Return the duration of the database write in milliseconds.
+        A failed snapshot refresh is kept in snapshot_error"""
+        self.game.end = datetime.now()
+        try:
+            save_ms = self.db.complete_session(self.game.game_id, self.game.end)
+        except Exception:
+            self.game.end = None
+            raise
+        # Keep the columnar snapshot of the history up to date. The game
+        # is saved anyway, the caller decides how to report the error
+        self.snapshot_error = None
+        try:
+            self.db.refresh_snapshot()
+        except OSError as e:
+            self.snapshot_error = e
+        self.reset()
+        return save_ms
+
+    def discard(self) -> None:
+        """Delete the session in progress and prepare the next session"""
+        if self.started:
+            self.db.discard_session(self.game.game_id)
+        self.reset()
+
+    def resume(self, game_id: int, game_start, game_type: str) -> None:
+        """Continue a session in progress that is stored in the database,
+        e.g. after the application crashed"""
+        self.game_type = game_type
+        self.x01 = self._new_leg()
+        self.game = Game(game_id, game_type)
+        self.game.start = datetime.fromisoformat(str(game_start))
+        self.game.game_started = True
+        self.records = self.db.load_session(game_id)
+        self.stats.reset()
+        self.windows.reset()
+        for index in range(len(self.records)):
+            self.stats.add_visit(self.records.codes(index))
+            self.windows.add_visit(self.records.total(index))
+        self._rebuild_leg()
+
+    def reset(self) -> None:
+        """Forget the visits and start over with a new game"""
+        self.records.clear()
+        self.stats.reset()
+        self.windows.reset()
+        if self.x01 is not None:
+            self.x01.reset()
+        self.game = self._new_game()
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,97 @@
+from array import array
+from dataclasses import dataclass
+from typing import Iterable, Iterator
+
+from engine.darts import DARTS_BY_CODE, DART_VALUES
+
+
+@dataclass(frozen=True)
+class ThrowRecord:
+    """Typed session record for a single three-dart visit."""
+    visit_id: int
+    throw_1: str
+    throw_2: str
+    throw_3: str
+    total: int
+
+
+class SessionRecords():
+    """Visits of a session stored in typed parallel arrays.
+
+    Every visit takes three bytes for its dart codes (see engine.darts) and
+    two bytes for its total. ThrowRecord row views are created on demand,
+    so editing a dart only overwrites one byte and one total."""
+
+    def __init__(self) -> None:
+        """Construct an empty session"""
+        self._darts = array("B")
+        self._totals = array("H")
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple]) -> "SessionRecords":
+        """Create a session from (dart_1, dart_2, dart_3, ...) rows,
+        e.g. rows of the throws table"""
+        records = cls()
+        for row in rows:
+            records.append(row[:3])
+        return records
+
+    def __len__(self) -> int:
+        return len(self._totals)
+
+    def __getitem__(self, index: int) -> ThrowRecord:
+        """Return the row view of the visit at index"""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("visit index out of range")
+        dart_1, dart_2, dart_3 = self.codes(index)
+        return ThrowRecord(
+            visit_id=index + 1,
+            throw_1=DARTS_BY_CODE[dart_1].token,
+            throw_2=DARTS_BY_CODE[dart_2].token,
+            throw_3=DARTS_BY_CODE[dart_3].token,
+            total=self._totals[index],
+        )
+
+    def __iter__(self) -> Iterator[ThrowRecord]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def codes(self, index: int) -> tuple:
+        """Return the three dart codes of the visit at index"""
+        start = index * 3
+        return tuple(self._darts[start:start + 3])
+
+    def total(self, index: int) -> int:
+        """Return the total of the visit at index"""
+        return self._totals[index]
+
+    def append(self, codes: tuple) -> ThrowRecord:
+        """Append a visit of three dart codes and return its row view"""
+        self._darts.extend(codes)
+        self._totals.append(sum(DART_VALUES[code] for code in codes))
+        return self[len(self) - 1]
+
+    def replace_dart(self, index: int, position: int, code: int) -> tuple:
+        """Replace one dart (position 0-2) of the visit at index.
+        Return the dart codes of the visit before and after the change"""
+        old_codes = self.codes(index)
+        self._darts[index * 3 + position] = code
+        new_codes = self.codes(index)
+        self._totals[index] = sum(DART_VALUES[code] for code in new_codes)
+        return (old_codes, new_codes)
+
+    def rows(self) -> Iterator[tuple]:
+        """Yield the visits as (throw_1, throw_2, throw_3, total)"""
+        for record in self:
+            yield (record.throw_1, record.throw_2, record.throw_3, record.total)
+
+    def clear(self) -> None:
+        """Remove all visits"""
+        del self._darts[:]
+        del self._totals[:]
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,184 @@
+from array import array
+
+from engine.darts import dart_value, is_treble
+
+MAX_VISIT_SCORE = 180
+DEFAULT_WINDOW_SIZE = 7
+
+
+class SessionStatistics():
+    """Running statistics of a scoring session.
+
+    Visits are given as three dart codes (see engine.darts). Adding,
+    replacing and removing a visit costs the same no matter how long the
+    session is: sums and counters are updated with the difference, and the
+    maximum is tracked with a histogram of the visit totals, so lowering
+    the current maximum only needs a scan over at most 181 buckets."""
+
+    def __init__(self) -> None:
+        """Construct statistics of an empty session"""
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget all visits"""
+        self.visits = 0
+        self.score = 0
+        self.trebleless_visits = 0
+        self.dart_sums = [0, 0, 0]
+        self.current_max = 0
+        self._total_counts = [0] * (MAX_VISIT_SCORE + 1)
+
+    def add_visit(self, codes: tuple) -> None:
+        """Add a visit of three dart codes"""
+        self._apply(codes, 1)
+
+    def remove_visit(self, codes: tuple) -> None:
+        """Remove a previously added visit"""
+        self._apply(codes, -1)
+
+    def replace_visit(self, old_codes: tuple, new_codes: tuple) -> None:
+        """Replace a previously added visit, e.g. after a cell edit"""
+        self._apply(old_codes, -1)
+        self._apply(new_codes, 1)
+
+    def _apply(self, codes: tuple, sign: int) -> None:
+        """Add (sign = 1) or remove (sign = -1) a visit"""
+        values = [dart_value(code) for code in codes]
+        total = sum(values)
+        self.visits += sign
+        self.score += sign * total
+        for i, value in enumerate(values):
+            self.dart_sums[i] += sign * value
+        if not any(is_treble(code) for code in codes):
+            self.trebleless_visits += sign
+
+        self._total_counts[total] += sign
+        if sign > 0 and total > self.current_max:
+            self.current_max = total
+        elif sign < 0 and total == self.current_max:
+            while self.current_max > 0 and not self._total_counts[self.current_max]:
+                self.current_max -= 1
+
+    def as_display_values(self) -> dict:
+        """Return the statistics formatted for the Statistics panel"""
+        if self.visits == 0:
+            return {
+                "avg": "0.0",
+                "darts_thrown": "0",
+                "score": "0",
+                "current_max": "0",
+                "trebleless_visits": "0.0%",
+                "dart_avg_1": "0.0",
+                "dart_avg_2": "0.0",
+                "dart_avg_3": "0.0",
+            }
+
+        trebleless_ratio = self.trebleless_visits / self.visits * 100
+        return {
+            "avg": f"{self.score / self.visits:.1f}",
+            "darts_thrown": f"{self.visits * 3}",
+            "score": f"{self.score}",
+            "current_max": f"{self.current_max}",
+            "trebleless_visits": f"{trebleless_ratio:.1f}%",
+            "dart_avg_1": f"{self.dart_sums[0] / self.visits:.1f}",
+            "dart_avg_2": f"{self.dart_sums[1] / self.visits:.1f}",
+            "dart_avg_3": f"{self.dart_sums[2] / self.visits:.1f}",
+        }
+
+
+class WindowStatistics():
+    """Rolling average over the last N visits and the best and worst
+    N-visit windows of a session.
+
+    The sum of every window of N consecutive visits is kept, a new visit
+    adds one window in O(1) (previous sum + new total - total leaving the
+    window). The best and worst sums are tracked with a histogram of the
+    window sums, like the maximum of SessionStatistics. Editing a visit
+    changes the at most N windows that contain it."""
+
+    def __init__(self, size: int = DEFAULT_WINDOW_SIZE) -> None:
+        """Construct the statistics of windows of size visits"""
+        self.size = max(1, size)
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget all visits"""
+        self._totals = array("H")
+        # _window_sums[i] = sum of the visits i .. i + size - 1
+        self._window_sums = array("L")
+        self._sum_counts = [0] * (MAX_VISIT_SCORE * self.size + 1)
+        self.best_sum = None
+        self.worst_sum = None
+
+    def add_visit(self, total: int) -> None:
+        """Add the total of a new visit"""
+        self._totals.append(total)
+        visits = len(self._totals)
+        if visits < self.size:
+            return
+        if self._window_sums:
+            window_sum = (self._window_sums[-1] + total
+                          - self._totals[visits - self.size - 1])
+        else:
+            window_sum = sum(self._totals)
+        self._window_sums.append(window_sum)
+        self._add_sum(window_sum)
+
+    def replace_visit(self, index: int, new_total: int) -> None:
+        """Change the total of the visit at index, e.g. after a cell edit"""
+        delta = new_total - self._totals[index]
+        self._totals[index] = new_total
+        if not delta:
+            return
+        first = max(0, index - self.size + 1)
+        last = min(index, len(self._window_sums) - 1)
+        for window in range(first, last + 1):
+            self._remove_sum(self._window_sums[window])
+            self._window_sums[window] += delta
+            self._add_sum(self._window_sums[window])
+
+    def _add_sum(self, window_sum: int) -> None:
+        """Count a window sum and update the best and worst sums"""
+        self._sum_counts[window_sum] += 1
+        if self.best_sum is None or window_sum > self.best_sum:
+            self.best_sum = window_sum
+        if self.worst_sum is None or window_sum < self.worst_sum:
+            self.worst_sum = window_sum
+
+    def _remove_sum(self, window_sum: int) -> None:
+        """Uncount a window sum and update the best and worst sums"""
+        self._sum_counts[window_sum] -= 1
+        if window_sum == self.best_sum:
+            while self.best_sum > 0 and not self._sum_counts[self.best_sum]:
+                self.best_sum -= 1
+        if window_sum == self.worst_sum:
+            while (self.worst_sum < len(self._sum_counts) - 1
+                   and not self._sum_counts[self.worst_sum]):
+                self.worst_sum += 1
+
+    def rolling_average(self) -> float:
+        """Average of the last size visits, or of all visits if there
+        are fewer of them"""
+        if not self._totals:
+            return 0.0
+        if self._window_sums:
+            return self._window_sums[-1] / self.size
+        return sum(self._totals) / len(self._totals)
+
+    def as_display_values(self) -> dict:
+        """Return the statistics formatted for the Statistics panel.
+        Best and worst are "-" until the first window is complete"""
+        if self.best_sum is None:
+            best, worst = "-", "-"
+        else:
+            best = f"{self.best_sum / self.size:.1f}"
+            worst = f"{self.worst_sum / self.size:.1f}"
+        return {
+            "rolling_avg": f"{self.rolling_average():.1f}",
+            "best_window": best,
+            "worst_window": worst,
+        }
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,125 @@
+"""Cached, incremental trend curves of the plots.
+
+A trend is a PCHIP interpolation through the observed points, evaluated
+on whole days. The curve is not evaluated on every day: the step between
+its days grows with the history, so it has at most max_points points
+(e.g. the width of the plot in pixels), plus the first and last day.
+
+PCHIP is local: the slope at a point only depends on its neighbours. So
+if points are changed or added at the end of the history, the curve up
+to two points before the first change is kept, and only the rest is
+computed again. If scipy is not available, the points are connected by
+straight lines."""
+import threading
+from typing import Optional
+
+import numpy as np
+
+try:
+    from scipy.interpolate import PchipInterpolator
+except ImportError:
+    PchipInterpolator = None
+
+# Points of a curve when the plot width is not known
+DEFAULT_MAX_POINTS = 2000
+
+
+def grid_step(first_day: int, last_day: int, max_points: int) -> int:
+    """Return the days between two points of a curve from first_day
+    to last_day with at most max_points points"""
+    return max(1, -(-(last_day - first_day + 1) // max(1, max_points)))
+
+
+def evaluation_days(first_day: int, last_day: int, step: int) -> np.ndarray:
+    """Return the days of the curve from first_day to last_day: the
+    multiples of step in between, and both ends"""
+    start = -(-first_day // step) * step
+    days = np.arange(start, last_day + 1, step, dtype=np.int64)
+    if not len(days) or days[0] != first_day:
+        days = np.concatenate(([first_day], days))
+    if days[-1] != last_day:
+        days = np.concatenate((days, [last_day]))
+    return days
+
+
+def interpolate(knot_days: np.ndarray, knot_values: np.ndarray,
+                days: np.ndarray) -> np.ndarray:
+    """Return the PCHIP interpolation through the knots at days"""
+    if len(knot_days) == 1:
+        return np.full(len(days), knot_values[0], dtype=float)
+    if PchipInterpolator is None:
+        return np.interp(days, knot_days, knot_values)
+    return PchipInterpolator(knot_days, knot_values)(days)
+
+
+class TrendCurve():
+    """Trend of a series of observed points, kept between updates"""
+
+    def __init__(self) -> None:
+        """Construct an empty curve"""
+        self.knot_days = np.empty(0, dtype=np.int64)
+        self.knot_values = np.empty(0, dtype=float)
+        self.step: Optional[int] = None
+        self.days = np.empty(0, dtype=np.int64)
+        self.values = np.empty(0, dtype=float)
+        self.recomputed_points = 0
+        self._lock = threading.Lock()
+
+    def update(self, knot_days: np.ndarray, knot_values: np.ndarray,
+               max_points: int = DEFAULT_MAX_POINTS) -> tuple:
+        """Return the days and values of the trend through the points
+        (sorted days without duplicates). Only the part that changed
+        since the last update is computed"""
+        knot_days = np.asarray(knot_days, dtype=np.int64)
+        knot_values = np.asarray(knot_values, dtype=float)
+        with self._lock:
+            if not len(knot_days):
+                self._store(knot_days, knot_values, None, knot_days, knot_values)
+                return (self.days, self.values)
+            step = grid_step(knot_days[0], knot_days[-1], max_points)
+            changed = self._first_change(knot_days, knot_values)
+            if step != self.step:
+                changed = 0
+            elif changed is None:
+                return (self.days, self.values)
+            # The intervals of the two points before a change use its slope
+            start = max(0, changed - 2)
+            start_day = knot_days[start]
+            keep = np.searchsorted(self.days, start_day) if start else 0
+            days = evaluation_days(knot_days[0], knot_days[-1], step)
+            days = days[np.searchsorted(days, start_day):]
+            # One more point, so the slope of the first kept point is exact
+            first_knot = max(0, start - 1)
+            values = interpolate(knot_days[first_knot:], knot_values[first_knot:], days)
+            self.recomputed_points += len(days)
+            self._store(knot_days, knot_values, step,
+                        np.concatenate((self.days[:keep], days)),
+                        np.concatenate((self.values[:keep], values)))
+            return (self.days, self.values)
+
+    def _first_change(self, knot_days: np.ndarray,
+                      knot_values: np.ndarray) -> Optional[int]:
+        """Return the index of the first point that differs from the
+        last update, None if all are the same"""
+        common = min(len(knot_days), len(self.knot_days))
+        differs = np.flatnonzero(
+            (knot_days[:common] != self.knot_days[:common])
+            | (knot_values[:common] != self.knot_values[:common]))
+        if len(differs):
+            return int(differs[0])
+        if len(knot_days) == len(self.knot_days):
+            return None
+        return common
+
+    def _store(self, knot_days: np.ndarray, knot_values: np.ndarray,
+               step: Optional[int], days: np.ndarray, values: np.ndarray) -> None:
+        """Keep the points and the curve of an update"""
+        self.knot_days = knot_days
+        self.knot_values = knot_values
+        self.step = step
+        self.days = days
+        self.values = values
+
+
+if __name__ == "__main__":
+    pass
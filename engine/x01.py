@@ -0,0 +1,78 @@
+"""Score keeping of an X01 double-out leg, e.g. 501 or 301.
+
+A visit is applied dart by dart. It is a bust, and scores nothing, if
+it leaves less than zero, exactly one, or zero without finishing on a
+double (or the bullseye). Darts entered after the checkout are ignored."""
+from typing import Iterable, NamedTuple, Optional
+
+from engine.checkout import Suggestion, suggest
+from engine.darts import DARTS_BY_CODE
+
+# Game type stored in games.type -> start score
+X01_START_SCORES = {"501": 501, "301": 301}
+
+
+class VisitResult(NamedTuple):
+    """Outcome of a visit of an X01 leg"""
+    points: int
+    bust: bool
+    checkout: bool
+
+
+class X01Leg():
+    """Remaining score of an X01 leg"""
+
+    def __init__(self, start_score: int) -> None:
+        """Construct a leg that starts at start_score"""
+        self.start_score = start_score
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget all visits"""
+        self.remaining = self.start_score
+        self.checked_out = False
+        self.darts_thrown = 0
+        self.last_result: Optional[VisitResult] = None
+
+    def add_visit(self, codes: tuple) -> VisitResult:
+        """Apply a visit of three dart codes and return its outcome"""
+        if self.checked_out:
+            raise ValueError("The leg is checked out already")
+        remaining = self.remaining
+        result = None
+        for thrown, code in enumerate(codes, start=1):
+            dart = DARTS_BY_CODE[code]
+            remaining -= dart.value
+            if remaining == 0 and dart.is_double:
+                self.checked_out = True
+                self.darts_thrown += thrown
+                result = VisitResult(self.remaining, False, True)
+                break
+            if remaining < 2:
+                result = VisitResult(0, True, False)
+                self.darts_thrown += thrown
+                break
+        if result is None:
+            result = VisitResult(self.remaining - remaining, False, False)
+            self.darts_thrown += len(codes)
+        self.remaining -= result.points
+        self.last_result = result
+        return result
+
+    def rebuild(self, visits: Iterable[tuple]) -> None:
+        """Recalculate the leg from all of its visits, e.g. after an edit"""
+        self.reset()
+        for codes in visits:
+            if self.checked_out:
+                break
+            self.add_visit(codes)
+
+    def suggestion(self) -> Optional[Suggestion]:
+        """Return the checkout or setup suggestion for the next visit"""
+        if self.checked_out:
+            return None
+        return suggest(self.remaining)
+
+
+if __name__ == "__main__":
+    pass
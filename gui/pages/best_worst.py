@@ -170,8 +170,9 @@ class BestWorstSettings(ttk.LabelFrame):
                         throws.throw_1, throws.throw_2, throws.throw_3, 
                         sum
                         FROM games
-                        JOIN throws ON games.game_id=throws.game_id
-                        WHERE date BETWEEN ? AND ?;"""
+                        JOIN throws_text AS throws ON games.game_id=throws.game_id
+                        WHERE games.game_end IS NOT NULL
+                        AND date BETWEEN ? AND ?;"""
         return self.master.db.query_to_dataframe_raw(
             sql_script,
             params=(str(start_date), str(end_date)),
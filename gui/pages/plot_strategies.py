@@ -1,20 +1,39 @@
 from __future__ import annotations
-import os
 from typing import TYPE_CHECKING, Tuple
 import matplotlib.dates as mdates
-import matplotlib.pyplot as plt
 import matplotlib.ticker as mticker
+import numpy as np
 import pandas as pd
 import seaborn as sns
 from abc import ABC, abstractmethod
 from matplotlib.figure import Figure, Axes
+from engine.downsample import lttb, max_buckets
+from engine.trend import DEFAULT_MAX_POINTS, TrendCurve
 
 if TYPE_CHECKING:
     from db.database import DataBase
 
 
+class PlotFigure():
+    """A persistent figure of a strategy: the figure, its axes and the
+    artists whose data is replaced when the plot is updated"""
+    def __init__(self, fig: Figure, axes: list) -> None:
+        """Construct the container of a figure and its axes"""
+        self.fig = fig
+        self.axes = axes
+        self.artists: dict = {}
+
+
 class PlotStrategy(ABC):
-    """Strategy Interface for plot builder algorithms"""
+    """Strategy Interface for plot builder algorithms.
+
+    A strategy creates its figure and artists once (create_figure) and
+    afterwards only replaces their data (update_figure), so switching the
+    plot or the sampling rule does not rebuild the figure.
+
+    load_data does the query, the resampling and the smoothing and does
+    not touch the figure, so it can run on a worker thread. Its result is
+    a dict of plain arrays, which update_figure puts on the artists."""
 
     COLOR_POINT = "#2A6FBB"
     COLOR_RAW_LINE = "#B0B8C5"
@@ -22,28 +41,80 @@ class PlotStrategy(ABC):
     COLOR_BAR = "#5A9E6F"
     COLOR_BAR_EDGE = "#356D4A"
 
+    # Bar width of a single bar in days, by sampling rule
+    BAR_WIDTH_DAYS = {"D": 0.8, "MS": 24, "YS": 290}
+
+    # Dense data is downsampled to one observed point per POINT_PIXELS
+    # and one bar per BAR_PIXELS pixels of the plot width
+    downsample = True
+    POINT_PIXELS = 2
+    BAR_PIXELS = 3
+    # Labels of a bar plot, only every n-th bar is labeled above this
+    MAX_BAR_LABELS = 30
+
+    # Columns of DataBase.daily_metrics used by the strategy
+    columns: list = []
+
+    def __init__(self) -> None:
+        """Construct the strategy with an empty trend cache"""
+        # Sampling rule -> trend curve, kept between loads
+        self._trends: dict[str, TrendCurve] = {}
+
     def build_plot(self, db: DataBase, sampling_rule: str) -> Tuple[Figure, Axes]:
-        """Execute plot builder process"""
-        df = self._create_df(db, self.sql_script, sampling_rule)
+        """Execute plot builder process, the figure is created new"""
+        plot_figure = self.create_figure()
+        self.update_figure(plot_figure, self.load_data(db, sampling_rule),
+                           sampling_rule)
+        return (plot_figure.fig, plot_figure.axes[0])
+
+    def load_data(self, db: DataBase, sampling_rule: str,
+                  max_points: int = DEFAULT_MAX_POINTS) -> dict:
+        """Return the data of the plot, ready to be put on the artists.
+        max_points is the resolution of the plot, e.g. its width in pixels"""
+        df = self._create_df(db, sampling_rule)
+        data = self._prepare_data(df, sampling_rule, max_points)
+        data["subtitle"] = self._range_subtitle(df)
+        return data
+
+    def create_figure(self) -> PlotFigure:
+        """Create the figure, its axes and its (empty) artists"""
         sns.set_theme(style="whitegrid", context="notebook")
-        fig, ax = self._create_plot_content(df)
-        fig, ax = self._format_plot_content(fig, ax, sampling_rule)
-        fig.tight_layout()
-        return (fig, ax)
+        fig = Figure(layout="tight")
+        plot_figure = PlotFigure(fig, [fig.add_subplot(1, 1, 1)])
+        self._create_artists(plot_figure)
+        return plot_figure
+
+    def update_figure(self, plot_figure: PlotFigure, data: dict,
+                      sampling_rule: str) -> None:
+        """Replace the data of the artists with data of load_data and
+        rescale the axes"""
+        self._update_artists(plot_figure, data, sampling_rule)
+        plot_figure.axes[0].set_title(data["subtitle"], fontsize=9,
+                                      color="#6D7785", pad=6)
+        for ax in plot_figure.axes:
+            self._format_plot_content(plot_figure.fig, ax, sampling_rule)
+            if ax.get_autoscalex_on() or ax.get_autoscaley_on():
+                ax.relim(visible_only=True)
+                ax.autoscale_view()
+
+    def _create_df(self, db: DataBase, sampling_rule: str) -> pd.DataFrame:
+        """Default implementation: select the strategy's columns from the
+        shared daily metrics, resampled in memory by the database.
+        Override only if your data loading differs."""
+        return db.daily_metrics(sampling_rule)[self.columns]
 
-    def _create_df(self, db: DataBase, sql_script: str, sampling_rule: str) -> None:
-        """Default implementation: connect, query, resample. Override only if you 
-        data loading differs."""
-        df = db.query_to_dataframe(
-            sql_script,
-            parse_dates={"date": {"format": "%Y-%m-%d"}},
-        )
-        df = df.set_index("date")
-        df = df.resample(sampling_rule).sum()
-        return df
+    @abstractmethod
+    def _create_artists(self, plot_figure: PlotFigure) -> None:
+        pass
+
+    @abstractmethod
+    def _prepare_data(self, df: pd.DataFrame, sampling_rule: str,
+                      max_points: int) -> dict:
+        pass
 
     @abstractmethod
-    def _create_plot_content(self, df: pd.DataFrame) -> Tuple[Figure, Axes]:
+    def _update_artists(self, plot_figure: PlotFigure, data: dict,
+                        sampling_rule: str) -> None:
         pass
 
     def _format_plot_content(self, fig, ax, sampling_rule) -> Tuple[Figure, Axes]:
@@ -71,250 +142,285 @@ class PlotStrategy(ABC):
         return (fig, ax)
 
     @staticmethod
-    def _smooth_daily_series(series: pd.Series) -> pd.Series:
-        """Create a daily, smooth curve without spline overshoot artifacts."""
-        s = series.replace([float("inf"), -float("inf")], pd.NA).dropna()
-        if s.empty:
-            return s
-
-        s = s[~s.index.duplicated(keep="first")].sort_index()
-        s_daily = s.resample("D").asfreq()
-
-        try:
-            return s_daily.interpolate(method="pchip")
-        except (ValueError, ImportError):
-            try:
-                return s_daily.interpolate(method="time")
-            except ValueError:
-                return s
+    def _date_values(index: pd.Index) -> np.ndarray:
+        """Convert a DatetimeIndex to matplotlib date numbers"""
+        return mdates.date2num(index.to_numpy())
+
+    def _create_trend_artists(self, ax: Axes, artists: dict) -> None:
+        """Create the observed points, the dashed observed line and the
+        smoothed trend line, without data"""
+        ax.xaxis_date()
+        artists["points"] = ax.scatter([], [], color=self.COLOR_POINT, marker="o",
+                                       s=28, edgecolor="white", linewidth=0.5)
+        artists["observed"], = ax.plot([], [], color=self.COLOR_RAW_LINE, linewidth=1.4,
+                                       alpha=0.9, linestyle="--", label="Observed")
+        artists["trend"], = ax.plot([], [], color=self.COLOR_TREND, linewidth=2.4,
+                                    label="Trend")
+        ax.legend(loc="upper left", frameon=False, fontsize=9)
+
+    def _trend_data(self, values: pd.Series, sampling_rule: str,
+                    max_points: int) -> dict:
+        """Return the observed points of values and their smoothed trend"""
+        observed = values.replace([float("inf"), -float("inf")], np.nan).dropna()
+        observed = observed[~observed.index.duplicated(keep="first")].sort_index()
+        trend = self._trends.setdefault(sampling_rule, TrendCurve())
+        trend_days, trend_values = trend.update(
+            observed.index.to_numpy(dtype="datetime64[D]").astype(np.int64),
+            observed.to_numpy(dtype=float), max_points)
+        observed_x = self._date_values(observed.index)
+        observed_y = observed.to_numpy(dtype=float)
+        if self.downsample:
+            # The trend is calculated from all points, only drawing is thinned
+            kept = lttb(observed_x, observed_y, max_points // self.POINT_PIXELS)
+            observed_x, observed_y = observed_x[kept], observed_y[kept]
+        return {
+            "observed_x": observed_x,
+            "observed_y": observed_y,
+            "trend_x": mdates.date2num(trend_days.astype("datetime64[D]")),
+            "trend_y": trend_values,
+        }
 
     @staticmethod
-    def _label_nonzero_bars(ax: Axes, values: pd.Series) -> None:
-        """Label bars sparsely to reduce visual clutter."""
-        if not ax.containers:
-            return
+    def _update_trend_artists(artists: dict, data: dict) -> None:
+        """Show the points, the observed line and the trend of data"""
+        artists["points"].set_offsets(np.column_stack((data["observed_x"],
+                                                       data["observed_y"])))
+        artists["observed"].set_data(data["observed_x"], data["observed_y"])
+        artists["trend"].set_data(data["trend_x"], data["trend_y"])
+
+    def _bar_data(self, values: pd.Series, sampling_rule: str,
+                  max_points: int) -> dict:
+        """Return the dates, heights, width and labels of bars of values.
+        If there are more bars than fit the plot width, neighbouring bars
+        are merged and show the largest value, so peaks stay visible"""
+        dates = self._date_values(values.index)
+        heights = values.fillna(0).to_numpy(dtype=float)
+        x, size = dates, 1
+        if self.downsample:
+            size, heights = max_buckets(heights, max_points // self.BAR_PIXELS)
+        if size > 1:
+            # A merged bar is centered on the dates of its bucket
+            starts = np.arange(0, len(dates), size)
+            x = np.add.reduceat(dates, starts) / np.diff(np.append(starts, len(dates)))
+        if len(dates) > 1:
+            width = 0.8 * size * float(np.min(np.diff(dates)))
+        else:
+            width = self.BAR_WIDTH_DAYS.get(sampling_rule, 0.8)
+        return {
+            "bar_x": x,
+            "bar_heights": heights,
+            "bar_width": width,
+            "bar_labels": self._bar_label_texts(pd.Series(heights)),
+        }
+
+    def _update_bars(self, ax: Axes, artists: dict, data: dict,
+                     sampling_rule: str) -> None:
+        """Show the bars of data. Every sampling rule keeps its own bars,
+        their heights are replaced and they are only created again if
+        the dates changed. The bars of the other rules are hidden"""
+        x, heights = data["bar_x"], data["bar_heights"]
+        width = data["bar_width"]
+        bar_sets = artists.setdefault("bars", {})
+        bars, bar_x, labels = bar_sets.get(sampling_rule, (None, None, []))
+        if bars is None or not np.array_equal(bar_x, x):
+            if bars is not None:
+                bars.remove()
+                for label in labels:
+                    label.remove()
+            bars = ax.bar(x, heights, width=width, color=self.COLOR_BAR,
+                          edgecolor=self.COLOR_BAR_EDGE, alpha=0.45)
+            labels = self._label_nonzero_bars(ax, bars, data["bar_labels"])
+        else:
+            for bar, height in zip(bars, heights):
+                bar.set_height(height)
+            for label, (index, text) in zip(labels, data["bar_labels"]):
+                label.xy = (label.xy[0], heights[index])
+                label.set_text(text)
+        bar_sets[sampling_rule] = (bars, x, labels)
+        if artists.get("bar_rule") != sampling_rule:
+            for rule, (other_bars, _, other_labels) in bar_sets.items():
+                visible = rule == sampling_rule
+                for artist in (*other_bars, *other_labels):
+                    artist.set_visible(visible)
+            artists["bar_rule"] = sampling_rule
+        # The limits are known, scaling to the bars would visit every patch
+        if len(x):
+            ax.set_xlim(x[0] - width, x[-1] + width)
+            ax.set_ylim(0, max(float(heights.max()), 1.0) * 1.1)
+        ax.xaxis_date()
+        ax.yaxis.set_major_locator(mticker.MaxNLocator(integer=True))
 
-        n = len(values)
-        step = 1 if n <= 14 else 2 if n <= 28 else 3
+    @classmethod
+    def _bar_label_texts(cls, values: pd.Series) -> list:
+        """Return the bar labels as [(bar index, text), ...], at most
+        MAX_BAR_LABELS of them, to reduce visual clutter. Bars without
+        value get an empty text"""
+        step = max(1, -(-len(values) // cls.MAX_BAR_LABELS))
         labels = []
-        for i, value in enumerate(values.fillna(0)):
-            if value <= 0 or i % step != 0:
-                labels.append("")
-            else:
-                labels.append(f"{int(round(value))}")
-        ax.bar_label(ax.containers[0], labels=labels, fontsize=9, padding=2, color="#28313C")
+        for i, value in enumerate(values.fillna(0).iloc[::step]):
+            labels.append((i * step, f"{int(round(value))}" if value > 0 else ""))
+        return labels
 
     @staticmethod
-    def _set_range_subtitle(ax: Axes, df: pd.DataFrame) -> None:
-        """Set compact subtitle with covered date range."""
+    def _label_nonzero_bars(ax: Axes, bars, labels: list) -> list:
+        """Label bars with the texts of _bar_label_texts, only the labeled
+        bars get an annotation. Return the label artists"""
+        label_artists = []
+        for index, text in labels:
+            bar = bars[index]
+            label_artists.append(ax.annotate(
+                text, xy=(bar.get_x() + bar.get_width() / 2, bar.get_height()),
+                xytext=(0, 2), textcoords="offset points", ha="center",
+                va="bottom", fontsize=9, color="#28313C"))
+        return label_artists
+
+    @staticmethod
+    def _range_subtitle(df: pd.DataFrame) -> str:
+        """Return compact subtitle with covered date range."""
         if df.empty:
-            return
+            return ""
         start = df.index.min().strftime("%Y-%m-%d")
         end = df.index.max().strftime("%Y-%m-%d")
-        ax.set_title(f"{start} to {end}", fontsize=9, color="#6D7785", pad=6)
+        return f"{start} to {end}"
 
 
 class ThreeDartAvg(PlotStrategy):
     """Strategy for three dart average plot"""
 
-    sql_script = os.path.join(
-        os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 
-        "sql", 
-        "avg.sql")
-      
-    def _create_plot_content(self, df: pd.DataFrame) -> Tuple[Figure, Axes]:
-        """Set up plot and create curves"""
-        # Figure setup
-        fig, ax = plt.subplots(1, 1)
-        fig.tight_layout(h_pad=5)
-        # Creating plot
+    columns = ["overall_score", "visits"]
+
+    def _create_artists(self, plot_figure: PlotFigure) -> None:
+        """Create the curves"""
+        self._create_trend_artists(plot_figure.axes[0], plot_figure.artists)
+
+    def _prepare_data(self, df: pd.DataFrame, sampling_rule: str,
+                      max_points: int) -> dict:
+        """Calculate the averages and their trend"""
         avg = df.overall_score.div(df.visits.where(df.visits != 0))
-        sns.scatterplot(x=df.index, y=avg,
-                        color=self.COLOR_POINT, marker='o', s=28, edgecolor="white", linewidth=0.5, ax=ax)
-        sns.lineplot(x=df.index, y=avg,
-                        color=self.COLOR_RAW_LINE, linewidth=1.4, alpha=0.9, label="Observed", ax=ax)
-        if ax.lines:
-            ax.lines[0].set_linestyle("--")
-        avg_smooth = self._smooth_daily_series(avg)
-        sns.lineplot(x=avg_smooth.index, y=avg_smooth,
-                     color=self.COLOR_TREND, linewidth=2.4, label="Trend", ax=ax)
-        ax.legend(loc="upper left", frameon=False, fontsize=9)
-        self._set_range_subtitle(ax, df)
-        return (fig, ax)
-    
+        return self._trend_data(avg, sampling_rule, max_points)
+
+    def _update_artists(self, plot_figure: PlotFigure, data: dict,
+                        sampling_rule: str) -> None:
+        """Show the averages"""
+        self._update_trend_artists(plot_figure.artists, data)
+
 
 class NrOfSessions(PlotStrategy):
     """Strategy for bar chart showing the nr of session played"""
 
-    sql_script = os.path.join(
-        os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 
-        "sql", 
-        "nr_of_games.sql")
-      
-    def _create_plot_content(self, df: pd.DataFrame) -> Tuple[Figure, Axes]:
-        """Set up plot and create curves"""
-        # Figure setup
-        fig, ax = plt.subplots(1, 1)
-        fig.tight_layout(h_pad=5)
-        # Creating plot
-        df_plot = df.reset_index()
-        sns.barplot(df_plot, x="date", y="nr_of_games", ax=ax,
-                    native_scale=True, color=self.COLOR_BAR, edgecolor=self.COLOR_BAR_EDGE, alpha=0.45)
-        ax.yaxis.set_major_locator(mticker.MaxNLocator(integer=True))
-        self._label_nonzero_bars(ax, df_plot["nr_of_games"])
-        self._set_range_subtitle(ax, df)
-        return (fig, ax)
-    
+    columns = ["nr_of_games"]
+
+    def _create_artists(self, plot_figure: PlotFigure) -> None:
+        """Bars are created with the data"""
+
+    def _prepare_data(self, df: pd.DataFrame, sampling_rule: str,
+                      max_points: int) -> dict:
+        """Calculate the bars of the nr of sessions"""
+        return self._bar_data(df["nr_of_games"], sampling_rule, max_points)
+
+    def _update_artists(self, plot_figure: PlotFigure, data: dict,
+                        sampling_rule: str) -> None:
+        """Show the nr of sessions"""
+        self._update_bars(plot_figure.axes[0], plot_figure.artists, data, sampling_rule)
+
 
 class NrOfDarts(PlotStrategy):
     """Strategy for bar chart showing the nr of darts thrown"""
 
-    sql_script = os.path.join(
-        os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 
-        "sql", 
-        "nr_of_darts.sql")
-
-    def _create_plot_content(self, df: pd.DataFrame) -> Tuple[Figure, Axes]:
-        """Set up plot and create curves"""
-        # Figure setup
-        fig, ax = plt.subplots(1, 1)
-        fig.tight_layout(h_pad=5)
-        # Creating plot
-        df_plot = df.reset_index()
-        sns.barplot(df_plot, x="date", y="darts_thrown", ax=ax,
-                    native_scale=True, color=self.COLOR_BAR, edgecolor=self.COLOR_BAR_EDGE, alpha=0.45)
-        ax.yaxis.set_major_locator(mticker.MaxNLocator(integer=True))
-        self._label_nonzero_bars(ax, df_plot["darts_thrown"])
-        self._set_range_subtitle(ax, df)
-        return (fig, ax)
+    columns = ["darts_thrown"]
+
+    def _create_artists(self, plot_figure: PlotFigure) -> None:
+        """Bars are created with the data"""
+
+    def _prepare_data(self, df: pd.DataFrame, sampling_rule: str,
+                      max_points: int) -> dict:
+        """Calculate the bars of the nr of darts"""
+        return self._bar_data(df["darts_thrown"], sampling_rule, max_points)
+
+    def _update_artists(self, plot_figure: PlotFigure, data: dict,
+                        sampling_rule: str) -> None:
+        """Show the nr of darts"""
+        self._update_bars(plot_figure.axes[0], plot_figure.artists, data, sampling_rule)
 
 
 class NrOf180s(PlotStrategy):
     """Strategy for bar chart showing the nr of 180s/171s thrown"""
 
-    sql_script = os.path.join(
-        os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 
-        "sql", 
-        "nr_of_180s.sql")
-
-    def _create_plot_content(self, df: pd.DataFrame) -> Tuple[Figure, Axes]:
-        """Set up plot and create curves"""
-        # Figure setup
-        fig, ax = plt.subplots(1, 1)
-        fig.tight_layout(h_pad=5)
-        # Creating plot
-        df_plot = df.reset_index()
-        sns.barplot(df_plot, x="date", y="visits_180", ax=ax,
-                    native_scale=True, color=self.COLOR_BAR, edgecolor=self.COLOR_BAR_EDGE, alpha=0.45)
-        ax.yaxis.set_major_locator(mticker.MaxNLocator(integer=True))
-        self._label_nonzero_bars(ax, df_plot["visits_180"])
-        self._set_range_subtitle(ax, df)
-        return (fig, ax)
+    columns = ["visits_180"]
+
+    def _create_artists(self, plot_figure: PlotFigure) -> None:
+        """Bars are created with the data"""
+
+    def _prepare_data(self, df: pd.DataFrame, sampling_rule: str,
+                      max_points: int) -> dict:
+        """Calculate the bars of the nr of 180s"""
+        return self._bar_data(df["visits_180"], sampling_rule, max_points)
+
+    def _update_artists(self, plot_figure: PlotFigure, data: dict,
+                        sampling_rule: str) -> None:
+        """Show the nr of 180s"""
+        self._update_bars(plot_figure.axes[0], plot_figure.artists, data, sampling_rule)
 
 
 class PercentageOfTreblelessVisits(PlotStrategy):
     """Strategy for plot showing the percentage of visits without trebles"""
 
-    sql_script = os.path.join(
-        os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 
-        "sql", 
-        "nr_of_trebleless_visits.sql")
-
-    def _create_plot_content(self, df: pd.DataFrame) -> Tuple[Figure, Axes]:
-        """Set up plot and create curves"""
-        # Figure setup
-        fig, ax = plt.subplots(1, 1)
-        fig.tight_layout(h_pad=5)
-        # Creating plot
+    columns = ["trebleless", "visits"]
+
+    def _create_artists(self, plot_figure: PlotFigure) -> None:
+        """Create the curves"""
+        self._create_trend_artists(plot_figure.axes[0], plot_figure.artists)
+
+    def _prepare_data(self, df: pd.DataFrame, sampling_rule: str,
+                      max_points: int) -> dict:
+        """Calculate the trebleless percentages and their trend"""
         no_treble_pct = df.trebleless.mul(100).div(df.visits.where(df.visits != 0))
-        sns.scatterplot(x=df.index, y=no_treble_pct,
-                        color=self.COLOR_POINT, marker='o', s=28, edgecolor="white", linewidth=0.5, ax=ax)
-        sns.lineplot(x=df.index, y=no_treble_pct,
-                        color=self.COLOR_RAW_LINE, linewidth=1.4, alpha=0.9, label="Observed", ax=ax)
-        if ax.lines:
-            ax.lines[0].set_linestyle("--")
-        no_treble_smooth = self._smooth_daily_series(no_treble_pct)
-        sns.lineplot(x=no_treble_smooth.index, y=no_treble_smooth,
-                     color=self.COLOR_TREND, linewidth=2.4, label="Trend", ax=ax)
-        ax.legend(loc="upper left", frameon=False, fontsize=9)
-        self._set_range_subtitle(ax, df)
-        return (fig, ax)
+        return self._trend_data(no_treble_pct, sampling_rule, max_points)
+
+    def _update_artists(self, plot_figure: PlotFigure, data: dict,
+                        sampling_rule: str) -> None:
+        """Show the trebleless percentages"""
+        self._update_trend_artists(plot_figure.artists, data)
 
 
 class AveragesAndSessions(PlotStrategy):
     """Strategy for combined plot of averages and nr of sessions"""
 
-    sql_avg_script = os.path.join(
-        os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 
-        "sql", 
-        "avg.sql")
-    
-    sql_sessions_script = os.path.join(
-        os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 
-        "sql", 
-        "nr_of_games.sql")
-
-    def build_plot(self, db: "DataBase", sampling_rule: str) -> "Tuple[Figure, Axes]":
-        """Execute plot builder process"""
-        df = self._create_df(db, "", sampling_rule)  # sql_script is not used
-        sns.set_theme(style="whitegrid", context="notebook")
-        plt.close('all')
-        fig, (ax_top, ax_bottom) = self._create_plot_content(df)
-        fig, ax_top = self._format_plot_content(fig, ax_top, sampling_rule)
-        fig, ax_bottom = self._format_plot_content(fig, ax_bottom, sampling_rule)
-        ax_top.tick_params(axis="x", labelbottom=False)
-        return (fig, ax_top)
-
-    def _create_df(self, db: "DataBase", sql_script: str, sampling_rule: str) -> pd.DataFrame:
-        """Create the DataFrame by running SQL scripts via DataBase."""
-        df_avg = db.query_to_dataframe(
-            self.sql_avg_script,
-            parse_dates={"date": {"format": "%Y-%m-%d"}},
-        )
-        df_avg = df_avg.set_index("date")
+    columns = ["overall_score", "visits", "nr_of_games"]
 
-        df_sessions = db.query_to_dataframe(
-            self.sql_sessions_script,
-            parse_dates={"date": {"format": "%Y-%m-%d"}},
-        )
-        df_sessions = df_sessions.set_index("date")
-
-        df = pd.merge(df_avg, df_sessions, on="date", how="outer").fillna(0)
-        df = df.resample(sampling_rule).sum()
-        
-        return df
-    
-    def _create_plot_content(self, df: pd.DataFrame) -> "Tuple[Figure, Tuple[Axes, Axes]]":
-        """Set up plot and create curves"""
-        # Figure setup
-        fig, (ax_top, ax_bottom) = plt.subplots(
+    def create_figure(self) -> PlotFigure:
+        """Create the figure with the averages on top of the sessions"""
+        sns.set_theme(style="whitegrid", context="notebook")
+        fig = Figure()
+        ax_top, ax_bottom = fig.subplots(
             2, 1, sharex=True, gridspec_kw={"height_ratios": [2, 1], "hspace": 0.04}
         )
         fig.subplots_adjust(left=0.07, right=0.985, top=0.95, bottom=0.10, hspace=0.06)
-        # Creating plot
-        avg = df.overall_score.div(df.visits.where(df.visits != 0))
-        sns.scatterplot(x=df.index, y=avg,
-                        color=self.COLOR_POINT, marker='o', s=28, edgecolor="white", linewidth=0.5, ax=ax_top)
-        sns.lineplot(x=df.index, y=avg,
-                        color=self.COLOR_RAW_LINE, linewidth=1.4, alpha=0.9, label="Observed", ax=ax_top)
-        if ax_top.lines:
-            ax_top.lines[0].set_linestyle("--")
-        avg_smooth = self._smooth_daily_series(avg)
-        sns.lineplot(x=avg_smooth.index, y=avg_smooth,
-                     color=self.COLOR_TREND, linewidth=2.4, label="Trend", ax=ax_top)
-        ax_top.set_ylabel("Three Dart Average")
-        ax_top.legend(loc="upper left", frameon=False, fontsize=9)
-
-        df_plot = df.reset_index()
-        sns.barplot(data=df_plot, x="date", y="nr_of_games", ax=ax_bottom,
-                    native_scale=True, color=self.COLOR_BAR, edgecolor=self.COLOR_BAR_EDGE, alpha=0.45)
-        ax_bottom.yaxis.set_major_locator(mticker.MaxNLocator(integer=True))
-        self._label_nonzero_bars(ax_bottom, df_plot["nr_of_games"])
-        ax_bottom.set_ylabel("Number of Sessions")
+        plot_figure = PlotFigure(fig, [ax_top, ax_bottom])
+        self._create_artists(plot_figure)
+        return plot_figure
+
+    def _create_artists(self, plot_figure: PlotFigure) -> None:
+        """Create the curves of the top axes"""
+        ax_top, ax_bottom = plot_figure.axes
+        self._create_trend_artists(ax_top, plot_figure.artists)
+        ax_top.tick_params(axis="x", labelbottom=False)
         ax_top.margins(x=0.01)
         ax_bottom.margins(x=0.01)
-        self._set_range_subtitle(ax_top, df)
-        return (fig, (ax_top, ax_bottom))
+
+    def _prepare_data(self, df: pd.DataFrame, sampling_rule: str,
+                      max_points: int) -> dict:
+        """Calculate the averages, their trend and the session bars"""
+        avg = df.overall_score.div(df.visits.where(df.visits != 0))
+        return {**self._trend_data(avg, sampling_rule, max_points),
+                **self._bar_data(df["nr_of_games"], sampling_rule, max_points)}
+
+    def _update_artists(self, plot_figure: PlotFigure, data: dict,
+                        sampling_rule: str) -> None:
+        """Show the averages and the nr of sessions"""
+        ax_top, ax_bottom = plot_figure.axes
+        self._update_trend_artists(plot_figure.artists, data)
+        self._update_bars(ax_bottom, plot_figure.artists, data, sampling_rule)
 
 
 if __name__ == "__main__":
@@ -1,41 +1,47 @@
+import sqlite3
 import tkinter as tk
 import tkinter.ttk as ttk
-from dataclasses import dataclass
-from datetime import datetime
 from ..constants import (
     FONT_TITLE,
     COLOR_FONT_TITLE,
 )
 from ..widgets.custom_popup import CustomPopup
-
-
-class Game():
-    """Class to contain game data"""
-    def __init__(self, game_id: int, game_type: str = "Scoring") -> None:
-        """Construct Game class"""
-        self.game_id = game_id
-        self.game_type = game_type
-        self.game_started = False
-        self.start = None
-        self.end = None
-
-    def initialize_game(self):
-        self.start = datetime.now()
-        self.game_started = True
-
-
-@dataclass(frozen=True)
-class ThrowRecord:
-    """Typed session record for a single three-dart visit."""
-    visit_id: int
-    throw_1: str
-    throw_2: str
-    throw_3: str
-    total: int
+from engine import darts
+from engine.scoring import GAME_TYPES, ScoringSession, convert_score
+from engine.session import SessionRecords, ThrowRecord
+
+
+class RefreshScheduler():
+    """Coalesce the refreshes of page parts. A part is marked dirty as
+    often as needed, its refresher runs once in the next idle cycle"""
+
+    def __init__(self, widget: tk.Misc, refreshers: dict) -> None:
+        """Construct the scheduler. refreshers = {part: function}, they
+        are run in this order"""
+        self.widget = widget
+        self.refreshers = refreshers
+        self.dirty: set[str] = set()
+        self._after_id = None
+
+    def mark_dirty(self, *parts: str) -> None:
+        """Schedule the refresh of the given parts"""
+        self.dirty.update(parts)
+        if self._after_id is None:
+            self._after_id = self.widget.after_idle(self.flush)
+
+    def flush(self) -> None:
+        """Run the refreshers of the dirty parts now"""
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+        dirty, self.dirty = self.dirty, set()
+        for part, refresher in self.refreshers.items():
+            if part in dirty:
+                refresher()
 
 
 class Scoring(ttk.Frame):
-    """Main class of Scoring page"""
+    """Main class of Scoring page, a view of an engine.scoring.ScoringSession"""
     def __init__(self, parent, db, *args, **kwargs) -> None:
         """Construct Scoring page"""
         # main config
@@ -49,9 +55,8 @@ class Scoring(ttk.Frame):
 
         # Initialize database
         self.db = db
-        # Initialize Game
-        self.game = Game(self.db.get_last_game_id() + 1)
-        self.throw_records: list[ThrowRecord] = []
+        # Initialize the session: game, visits, statistics and persistence
+        self.session = ScoringSession(self.db)
         # populating widgets
         self.create_gui()
 
@@ -76,76 +81,93 @@ class Scoring(ttk.Frame):
         self.throw_history_table = ThrowHistoryTable(self, text="Throw History")
         self.throw_history_table.grid(row=1, column=1, padx=10, pady=10,
                                 rowspan=3, sticky="news")
+
+        self.refresh_scheduler = RefreshScheduler(self, {
+            "table": self.throw_history_table.refresh,
+            "statistics": self.statistics.update_statistics,
+            "game": self.score_entry_block.update_game_status,
+        })
+        self.refresh_scheduler.mark_dirty("game")
         
         self._gui_created = True
 
-    @staticmethod
-    def convert_score(score: str) -> tuple:
-        """Convert score string to int. Return score string and score int 
-        as a tuple.
-        For example T20 -> ("T20", 60) or D5 -> ("D5", 10)"""
-        if not isinstance(score, str):
-            score = str(score)
-        converted_score = None
-        if score[0] in ["D", "+"]:
-            converted_score = int(score[1:]) * 2
-            score = "D" + score[1:]  
-        elif score[0] in ["T", "*"]:
-            converted_score = int(score[1:]) * 3
-            score = "T" + score[1:]
-        elif score in ["B", "R"]:
-            converted_score = 0
-        else:
-            converted_score = int(score)
-        return (score, converted_score)
-
-    def add_throw_record(self, throws: list[tuple[str, int]]) -> None:
-        """Append a typed throw record and sync the table and stats."""
-        visit_id = len(self.throw_records) + 1
-        total = sum(throw[1] for throw in throws)
-        record = ThrowRecord(
-            visit_id=visit_id,
-            throw_1=throws[0][0].upper(),
-            throw_2=throws[1][0].upper(),
-            throw_3=throws[2][0].upper(),
-            total=total,
+    def show_error(self, message: str, error: Exception) -> None:
+        """Report a failed database write"""
+        CustomPopup(
+            popup_type="error",
+            title="Error",
+            message=f"{message}\n{error}"
+        )
+
+    def resume_session(self, game_id: int, game_start, game_type: str) -> None:
+        """Continue a session in progress that is stored in the database,
+        e.g. after the application crashed"""
+        self.buttons_frame.restart()
+        self.session.resume(game_id, game_start, game_type)
+        self.throw_history_table.scroll_to(len(self.session.records))
+        self.refresh_scheduler.mark_dirty("statistics", "game")
+
+    def set_game_type(self, game_type: str) -> None:
+        """Change the type of the next game"""
+        try:
+            self.session.set_game_type(game_type)
+        except ValueError as e:
+            CustomPopup(popup_type="warning", title="Warning", message=str(e))
+        self.refresh_scheduler.mark_dirty("game")
+
+    def _check_for_checkout(self) -> None:
+        """Finish an X01 leg, once it is checked out"""
+        if not self.session.checked_out:
+            return
+        darts_thrown = self.session.x01.darts_thrown
+        if not self.buttons_frame.finish():
+            return
+        CustomPopup(
+            popup_type="information",
+            title="Game Shot",
+            message=f"Game shot! Checked out with {darts_thrown} darts."
         )
-        self.throw_records.append(record)
+
+    def add_throw_record(self, throws: list[tuple[str, int]]) -> bool:
+        """Add a visit to the session and sync the table and stats.
+        Return False if it could not be stored"""
+        codes = tuple(darts.encode_dart(throw[0]) for throw in throws)
+        try:
+            record = self.session.add_visit(codes)
+        except sqlite3.Error as e:
+            self.show_error("Failed to store the visit!", e)
+            return False
+        except ValueError as e:
+            CustomPopup(popup_type="warning", title="Warning", message=str(e))
+            return False
         self.throw_history_table.add_record(record)
-        self.statistics.update_statistics()
+        self.refresh_scheduler.mark_dirty("table", "statistics", "game")
+        self._check_for_checkout()
+        return True
 
     def update_throw_record(self, visit_id: int, column_id: int,
                             score: tuple[str, int]) -> bool:
-        """Replace one throw in the session model and sync the UI."""
+        """Replace one throw in the session and sync the UI."""
         if column_id not in {1, 2, 3}:
             return False
 
         record_index = visit_id - 1
-        if not 0 <= record_index < len(self.throw_records):
+        if not 0 <= record_index < len(self.session.records):
             return False
 
-        record = self.throw_records[record_index]
-        throws = [record.throw_1, record.throw_2, record.throw_3]
-        converted_scores = [Scoring.convert_score(value)[1] for value in throws]
-        throws[column_id - 1] = score[0].upper()
-        converted_scores[column_id - 1] = score[1]
-
-        updated_record = ThrowRecord(
-            visit_id=record.visit_id,
-            throw_1=throws[0],
-            throw_2=throws[1],
-            throw_3=throws[2],
-            total=sum(converted_scores),
-        )
-        self.throw_records[record_index] = updated_record
-        self.throw_history_table.update_record(updated_record)
-        self.statistics.update_statistics()
+        try:
+            self.session.replace_dart(record_index, column_id - 1,
+                                      darts.encode_dart(score[0]))
+        except sqlite3.Error as e:
+            self.show_error("Failed to store the change!", e)
+            return False
+        except ValueError as e:
+            CustomPopup(popup_type="warning", title="Warning", message=str(e))
+            return False
+        self.refresh_scheduler.mark_dirty("table", "statistics", "game")
+        self._check_for_checkout()
         return True
 
-    def clear_throw_records(self) -> None:
-        """Reset the in-memory session model."""
-        self.throw_records.clear()
-
 
 class PageTitle(ttk.Frame):
     """Class for page title"""
@@ -163,17 +185,39 @@ class ScoreEntryBlock(ttk.LabelFrame):
         """Construct entry fields, labels and a button to submit data"""
         super().__init__(parent, *args, **kwargs)
         self.parent = parent
-        self.rowconfigure((0, 1, 2, 3), weight=1)
+        self.rowconfigure((0, 1, 2, 3, 4, 5, 6), weight=1)
         self.columnconfigure((0, 1), weight=1)
-        self.throw_1 = ThrowEntry(self, "1st Throw:", 0)
-        self.throw_2 = ThrowEntry(self, "2nd Throw:", 1)
-        self.throw_3 = ThrowEntry(self, "3rd Throw:", 2)
+        self.game_type_label = ttk.Label(self, text="Game:")
+        self.game_type = ttk.Combobox(self, values=GAME_TYPES,
+                                      state="readonly", width=10)
+        self.game_type.set(self.parent.session.game_type)
+        self.game_type_label.grid(row=0, column=0, padx=10, pady=10)
+        self.game_type.grid(row=0, column=1, padx=10, pady=10)
+        self.throw_1 = ThrowEntry(self, "1st Throw:", 1)
+        self.throw_2 = ThrowEntry(self, "2nd Throw:", 2)
+        self.throw_3 = ThrowEntry(self, "3rd Throw:", 3)
         self.throw_entries = [self.throw_1, self.throw_2, self.throw_3]
+        # One field for a whole visit, e.g. "T20 T20 19" or "60 60 19",
+        # shown instead of the throw entries in quick entry mode
+        self.quick_mode = tk.BooleanVar(value=False)
+        self.quick_label = ttk.Label(self, text="Visit:")
+        self.quick_entry = ttk.Entry(self)
+        self.quick_label.grid(row=1, column=0, padx=10, pady=10)
+        self.quick_entry.grid(row=1, column=1, padx=10, pady=10)
+        self.quick_label.grid_remove()
+        self.quick_entry.grid_remove()
 
         self.submit = ttk.Button(self, text="Submit",
                                  command=self.submit_button_clicked)
-        self.submit.grid(row=3, column=0, columnspan=2, padx=10, pady=10,
+        self.submit.grid(row=4, column=0, columnspan=2, padx=10, pady=10,
                          sticky="news")
+        self.quick_toggle = ttk.Checkbutton(self, text="Quick entry",
+                                            variable=self.quick_mode,
+                                            command=self.toggle_quick_entry)
+        self.quick_toggle.grid(row=5, column=0, columnspan=2, padx=10)
+        # Remaining score and checkout suggestion of X01 games
+        self.x01_status = ttk.Label(self, text="")
+        self.x01_status.grid(row=6, column=0, columnspan=2, padx=10)
         self.create_bindings()
         
     def create_bindings(self) -> None:
@@ -183,6 +227,46 @@ class ScoreEntryBlock(ttk.LabelFrame):
         self.throw_2.value.bind("<Return>", lambda event=None:
                                 self.throw_3.value.focus_set())
         self.throw_3.value.bind("<Return>", self.submit_button_clicked)
+        self.quick_entry.bind("<Return>", self.submit_button_clicked)
+        self.game_type.bind("<<ComboboxSelected>>", lambda event=None:
+                            self.parent.set_game_type(self.game_type.get()))
+
+    def update_game_status(self) -> None:
+        """Show the remaining score and the suggestion of an X01 game and
+        lock the game type while a session is in progress"""
+        session = self.parent.session
+        self.game_type.set(session.game_type)
+        self.game_type.config(state="disabled" if session.started else "readonly")
+        leg = session.x01
+        text = ""
+        if leg is not None:
+            text = f"Remaining: {leg.remaining}"
+            if leg.last_result and leg.last_result.bust:
+                text += " (bust)"
+            suggestion = leg.suggestion()
+            if suggestion:
+                kind = "Checkout" if suggestion.is_checkout else "Setup"
+                text += f"    {kind}: {' '.join(suggestion.darts)}"
+        if text != self.x01_status.cget("text"):
+            self.x01_status.config(text=text)
+
+    def toggle_quick_entry(self) -> None:
+        """Switch between the quick entry field and the three throw fields"""
+        quick_mode = self.quick_mode.get()
+        for throw in self.throw_entries:
+            for widget in (throw.label, throw.value):
+                if quick_mode:
+                    widget.grid_remove()
+                else:
+                    widget.grid()
+        if quick_mode:
+            self.quick_label.grid()
+            self.quick_entry.grid()
+            self.quick_entry.focus_set()
+        else:
+            self.quick_label.grid_remove()
+            self.quick_entry.grid_remove()
+            self.throw_1.value.focus_set()
 
     def clear_values(self) -> None:
         """Clear score entry fields"""
@@ -200,32 +284,48 @@ class ScoreEntryBlock(ttk.LabelFrame):
 
     def submit_button_clicked(self, *ignore) -> None:
         """
-        0. Initialize Game.start time, if it's none
-        1. Get entried scores, populate table, clear entry fields
+        1. Get entried scores, store them, populate table, clear entry fields
         2. Update Statistics fields
         3. Set focus to throw_1 entry field
         """
+        if self.quick_mode.get():
+            self.submit_quick_entry()
+            return
+
         # Release focus from last entry widget, when called by <Return>
         # This way the entry will be validated, otherwise not
         self.parent.focus()
 
-        if not self.parent.game.game_started:
-            self.parent.game.initialize_game()
         # Check if entries are all valid
         validities = [throw.value.validate(throw.value.get().strip()) 
                       for throw in self.throw_entries]
         if not all(validities):
             self.throw_entries[validities.index(False)].value.focus()
             return
-        else:
-            self.add_throws_into_throw_history_table()
+        elif self.add_throws_into_throw_history_table():
             self.clear_values()
             self.throw_1.value.focus_set()
 
-    def add_throws_into_throw_history_table(self) -> None:
-        """Get entried scores and populate throw history table"""
+    def submit_quick_entry(self) -> None:
+        """Parse the quick entry field as a whole visit, validating the
+        three darts in one pass, and submit it"""
+        try:
+            visit_darts = darts.parse_visit(self.quick_entry.get())
+        except ValueError:
+            self.quick_entry.config(foreground="red")
+            self.quick_entry.focus_set()
+            return
+        self.quick_entry.config(foreground="black")
+        throws = [(dart.token, dart.value) for dart in visit_darts]
+        if self.parent.add_throw_record(throws):
+            self.quick_entry.delete(0, tk.END)
+        self.quick_entry.focus_set()
+
+    def add_throws_into_throw_history_table(self) -> bool:
+        """Get entried scores and populate throw history table.
+        Return False if the visit could not be stored"""
         throws = self.get_values()
-        self.parent.add_throw_record(throws)
+        return self.parent.add_throw_record(throws)
 
 
 class ThrowEntry():
@@ -242,18 +342,8 @@ class ScoreEntry(ttk.Entry):
     """Entry field to enter thrown score with methods to 
     validate and convert the score"""
 
-    # List of valid score entries:
-    #    0 : no score
-    #   25 : single bull
-    #   50 : bullseye
-    #    B : bouncer
-    #    R : robin hood
-    
-    VE_SINGLES = "1 2 3 4 5 6 7 8 9 10 11 12 13 14 15 16 17 18 19 20".split()
-    VE_DOUBLES = ["D" + single for single in VE_SINGLES] + ["+" + single for single in VE_SINGLES]
-    VE_TRIPLES = ["T" + single for single in VE_SINGLES] + ["*" + single for single in VE_SINGLES]
-    VE_SPECIAL = "0 25 50 B R".split()
-    VALID_ENTRIES = VE_SINGLES + VE_DOUBLES + VE_TRIPLES + VE_SPECIAL
+    # List of valid score entries, see engine.darts
+    VALID_ENTRIES = darts.VALID_ENTRIES
 
     def __init__(self, parent: tk.Widget, *args, **kwargs) -> None:
         """Construct ScoreEntry widget on parent widget"""
@@ -271,7 +361,7 @@ class ScoreEntry(ttk.Entry):
         if not self.validate(score):
             return ()
         else:
-            return Scoring.convert_score(score)
+            return convert_score(score)
         
     def validate(self, value: str) -> bool:
         """Check if entered score is a valid darts score"""
@@ -291,95 +381,63 @@ class Statistics(ttk.LabelFrame):
     def __init__(self, parent, *args, **kwargs) -> None:
         super().__init__(parent, *args, **kwargs)
         self.parent = parent
-        self.rowconfigure((0, 1, 2, 3, 4), weight=1)
+        self.rowconfigure((0, 1, 2, 3, 4, 5, 6, 7), weight=1)
         self.columnconfigure((0, 1), weight=1)
+        window_size = self.parent.session.windows.size
         self.avg = StatField(self, "Average:", "0.0", 0)
         self.darts_thrown = StatField(self, "Darts thrown:", "0", 1)
         self.score = StatField(self, "Score:", "0", 2)
         self.current_max = StatField(self, "Current maximum:", "0", 3)
         self.trebleless_visits = StatField(self, "Trebleless visits: ", "0.0 %", 4)
+        self.rolling_avg = StatField(self, f"Last {window_size} visits avg:", "0.0", 5)
+        self.best_window = StatField(self, f"Best {window_size} visits avg:", "-", 6)
+        self.worst_window = StatField(self, f"Worst {window_size} visits avg:", "-", 7)
         self._stat_fields = [
             self.avg,
             self.darts_thrown,
             self.score,
             self.current_max,
             self.trebleless_visits,
+            self.rolling_avg,
+            self.best_window,
+            self.worst_window,
         ]
+        # Values shown in the single dart statistic row
+        self._single_dart_values = ("AVG:", 0.0, 0.0, 0.0, "")
 
     # keyword args without default values
     def set_statistics(self, *, avg: str, darts_thrown: str,
                        score: str, current_max: str, 
                        trebleless_visits: str, dart_avg_1: str, 
-                       dart_avg_2: str, dart_avg_3: str) -> None:
+                       dart_avg_2: str, dart_avg_3: str, rolling_avg: str,
+                       best_window: str, worst_window: str) -> None:
         """Set values of statistics shown during a scoring session"""
-        self.avg.value.config(text=avg)
-        self.darts_thrown.value.config(text=darts_thrown)
-        self.score.value.config(text=score)
-        self.current_max.value.config(text=current_max)
-        self.trebleless_visits.value.config(text=trebleless_visits)
+        self.avg.set(avg)
+        self.darts_thrown.set(darts_thrown)
+        self.score.set(score)
+        self.current_max.set(current_max)
+        self.trebleless_visits.set(trebleless_visits)
+        self.rolling_avg.set(rolling_avg)
+        self.best_window.set(best_window)
+        self.worst_window.set(worst_window)
         self._set_single_dart_averages(dart_avg_1, dart_avg_2, dart_avg_3)
 
     def _set_single_dart_averages(self, dart_avg_1: str, dart_avg_2: str, 
                                   dart_avg_3: str) -> None:
-        """Set values of single dart average fields"""
-        self.parent.throw_history_table.single_dart_stat_row.item("I001", values=(
-            "AVG:", dart_avg_1, dart_avg_2, dart_avg_3))
+        """Set values of single dart average fields, if they changed"""
+        values = ("AVG:", dart_avg_1, dart_avg_2, dart_avg_3, "")
+        if values == self._single_dart_values:
+            return
+        self._single_dart_values = values
+        self.parent.throw_history_table.single_dart_stat_row.item("I001", values=values)
 
     def calculate_statistics(self) -> dict:
-        """Get throws from the session model, calculate statistics then
-        return them as a dictionary"""
-        throws = self.parent.throw_records
-        darts_thrown = len(throws) * 3
-
-        # Guard clause: return defaults if no throws recorded
-        if darts_thrown == 0:
-            return {
-                "avg": "0.0",
-                "darts_thrown": "0",
-                "score": "0",
-                "current_max": "0",
-                "trebleless_visits": "0.0%",
-                "dart_avg_1": "0.0",
-                "dart_avg_2": "0.0",
-                "dart_avg_3": "0.0",
-            }
-
-        current_max = 0
-        score = 0
-        nr_of_trebleless_visits = 0
-        dart_avg_1, dart_avg_2, dart_avg_3 = 0, 0, 0
-
-        for throw in throws:
-            score += throw.total
-            dart_avg_1 += Scoring.convert_score(throw.throw_1)[1]
-            dart_avg_2 += Scoring.convert_score(throw.throw_2)[1]
-            dart_avg_3 += Scoring.convert_score(throw.throw_3)[1]
-            if throw.total > current_max:
-                current_max = throw.total
-            is_treble_thrown = any(single_throw.startswith("T")
-                                   for single_throw in (
-                                       throw.throw_1,
-                                       throw.throw_2,
-                                       throw.throw_3,
-                                   ))
-            if not is_treble_thrown:
-                nr_of_trebleless_visits += 1
-
-        dart_avg_1 /= (darts_thrown / 3)
-        dart_avg_2 /= (darts_thrown / 3)
-        dart_avg_3 /= (darts_thrown / 3)
-
+        """Get the running statistics of the session model
+        as a dictionary of display values"""
+        session = self.parent.session
         return {
-            "avg": f'{score / darts_thrown * 3:.1f}',
-            "darts_thrown": f'{darts_thrown}',
-            "score": f'{score}',
-            "current_max": f'{current_max}',
-            "trebleless_visits": f'{nr_of_trebleless_visits 
-                                    / (darts_thrown / 3) 
-                                    * 100:.1f}%',
-            "dart_avg_1": f'{dart_avg_1:.1f}',
-            "dart_avg_2": f'{dart_avg_2:.1f}',
-            "dart_avg_3": f'{dart_avg_3:.1f}',
+            **session.stats.as_display_values(),
+            **session.windows.as_display_values(),
         }
         
     def update_statistics(self) -> None:
@@ -390,9 +448,8 @@ class Statistics(ttk.LabelFrame):
     def reset(self) -> None:
         """Reset statistics"""
         for stat_field in self._stat_fields:
-            stat_field.value.config(text=stat_field.initial_value)
-        self.parent.throw_history_table.single_dart_stat_row.item("I001", values=(
-            "AVG:", 0.0, 0.0, 0.0, ""))
+            stat_field.set(stat_field.initial_value)
+        self._set_single_dart_averages("0.0", "0.0", "0.0")
 
 class StatField():
     """Class for a statistic value shown in Statistics"""
@@ -400,27 +457,46 @@ class StatField():
                  value_text: str, row: int) -> None:
         """Construnct StatField on parent"""
         self.initial_value = value_text
+        self.text = value_text
         self.label = ttk.Label(parent, text=label_text)
         self.value = ttk.Label(parent, text=value_text)
         self.label.grid(row=row, column=0, padx=10, pady=5, sticky="e")
         self.value.grid(row=row, column=1, padx=10, pady=5, sticky="w")
 
+    def set(self, text: str) -> None:
+        """Show text as value. The label is only written, if the text
+        changed, so Tk does not redraw it needlessly"""
+        if text == self.text:
+            return
+        self.text = text
+        self.value.config(text=text)
+
 
 class ButtonsFrame(ttk.LabelFrame):
     """Frame that serves as a container for the Finish and Restart buttons"""
 
+    BACKUP_POLL_MS = 100
+
     def __init__(self, parent, *args, **kwargs) -> None:
         """Construct Frame that contains the Finish and Restart buttons"""
         super().__init__(parent, *args, **kwargs)
         self.parent = parent
         self.rowconfigure(0, weight=1)
         self.columnconfigure((0, 1), weight=1)
+        self.backup_jobs = []
         finish_button = ttk.Button(self, text="Finish",
                                    command=self.finish)
         restart_button = ttk.Button(self, text="Restart",
                                     command=self.restart_clicked)
         finish_button.grid(row=0, column=0, padx=10, pady=10, sticky="news")
         restart_button.grid(row=0, column=1, padx=10, pady=10, sticky="news")
+        self.backup_progress = ttk.Progressbar(self, mode="determinate")
+        self.backup_progress.grid(row=1, column=0, columnspan=2, padx=10,
+                                  pady=(0, 10), sticky="ew")
+        self.backup_progress.grid_remove()
+        self.status_label = ttk.Label(self, text="")
+        self.status_label.grid(row=2, column=0, columnspan=2, padx=10,
+                               pady=(0, 10), sticky="w")
 
     def restart_clicked(self):
         CustomPopup(
@@ -428,59 +504,101 @@ class ButtonsFrame(ttk.LabelFrame):
             title="Confirmation",
             message="Do you really want to restart the session?\n"
                     "Scores and statistics will be discarded!",
-            callback_fct=self.restart
+            callback_fct=self.discard
         )
 
+    def discard(self) -> None:
+        """Delete the session in progress from the database and reset it"""
+        try:
+            self.parent.session.discard()
+        except sqlite3.Error as e:
+            self.parent.show_error("Failed to discard the session!", e)
+            return
+        self.restart()
+
     def restart(self) -> None:
-        """Reset session - clear statistics and table records"""
-        self.parent.clear_throw_records()
+        """Reset the view of the session - clear statistics and table records"""
         self.parent.statistics.reset()
         self.parent.throw_history_table.clear_table()
-        self.parent.game.start = None
-        self.parent.game.game_started = False
+        self.parent.refresh_scheduler.mark_dirty("game")
 
-    def finish(self) -> None:
-        """Insert data into database and start new session"""
-        if not self.parent.game.start:
+    def finish(self) -> bool:
+        """Mark the session as finished in the database and start new session.
+        Return False if the session could not be saved"""
+        if not self.parent.session.started:
             # Nothing to save
-            return
+            return False
 
-        # Insert game
-        self.parent.game.end = datetime.now()
-        game_data = (
-            self.parent.game.game_id,
-            self.parent.game.start,
-            self.parent.game.end,
-            self.parent.game.game_type
-            )
-        self.parent.db.insert_game(game_data)
+        # The visits are stored already, only the game end is written
+        try:
+            save_ms = self.parent.session.finish()
+        except sqlite3.Error as e:
+            self.parent.show_error("Failed to save the session!", e)
+            return False
 
-        # Insert throws
-        for record in self.parent.throw_records:
-            throw_data = (
-                record.throw_1,
-                record.throw_2,
-                record.throw_3,
-                record.total,
+        self.status_label.config(text=f"Session saved in {save_ms:.1f} ms")
+        if self.parent.session.snapshot_error is not None:
+            CustomPopup(
+                popup_type="warning",
+                title="Warning",
+                message="The session is saved, but the snapshot of the history "
+                        f"could not be refreshed!\n{self.parent.session.snapshot_error}"
             )
-            record_to_insert = (self.parent.game.game_id,) + throw_data
-            self.parent.db.insert_data(record_to_insert)
 
-        # Backup database
-        if not self.parent.db.backup_database():
+        # Backup database in the background
+        self.start_backup()
+
+        # Show the new session
+        self.restart()
+        return True
+
+    def start_backup(self) -> None:
+        """Start a backup on a worker thread and poll it from the Tk loop"""
+        backup_job = self.parent.db.create_backup_job(
+            on_progress=self._on_backup_progress,
+            on_done=self._on_backup_done,
+        )
+        self.backup_jobs.append(backup_job)
+        self.backup_progress.config(value=0)
+        self.backup_progress.grid()
+        backup_job.start()
+        self.after(self.BACKUP_POLL_MS, self._poll_backup, backup_job)
+
+    def _poll_backup(self, backup_job) -> None:
+        """Dispatch backup events until the job reports completion"""
+        if backup_job.poll():
+            self.after(self.BACKUP_POLL_MS, self._poll_backup, backup_job)
+            return
+        self.backup_jobs.remove(backup_job)
+        if not self.backup_jobs:
+            self.backup_progress.grid_remove()
+
+    def _on_backup_progress(self, copied_pages: int, total_pages: int) -> None:
+        """Show backup progress"""
+        if total_pages:
+            self.backup_progress.config(value=copied_pages / total_pages * 100)
+
+    def _on_backup_done(self, success: bool, message: str) -> None:
+        """Report a failed backup"""
+        if not success:
             CustomPopup(
                 popup_type="error",
                 title="Error",
-                message="Failed to backup the database!"
+                message=f"Failed to backup the database!\n{message}"
             )
-        
-        # Start new game
-        self.restart()
-        self.parent.game = Game(self.parent.db.get_last_game_id() + 1)
 
 
 class ThrowHistoryTable(ttk.LabelFrame):
-    """Class to show thrown scores in a tabular format"""
+    """Class to show thrown scores in a tabular format.
+
+    The table is virtualized: it holds a fixed pool of row items (slots),
+    as many as fit on the screen, and fills them with the visits of the
+    session model starting at the scroll offset. Scrolling only rewrites
+    the values of the slots, so the cost of rendering does not depend on
+    the length of the session."""
+
+    # Slots created before the visible row count is measured
+    DEFAULT_VISIBLE_ROWS = 10
 
     def __init__(self, parent, *args, **kwargs) -> None:
         """Construct TrowHistory table to store thrown scores"""
@@ -488,8 +606,18 @@ class ThrowHistoryTable(ttk.LabelFrame):
         self.rowconfigure(0, weight=14)
         self.rowconfigure(1, weight=1)
         self.columnconfigure(0, weight=1)
-        self.row_items: dict[int, str] = {}
+        # Index of the visit shown in the first slot
+        self.offset = 0
+        self.slots: list[str] = []
+        # Slots are attached in order, the first attached_slots of them
+        # show visits, the rest is detached
+        self.attached_slots = 0
+        self._resize_pending = False
+        self._measured = False
+        # Scroll position requested for the next refresh
+        self._pending_offset = None
         self.throw_history_table = self._create_table()
+        self._set_slot_count(self.DEFAULT_VISIBLE_ROWS)
         self.single_dart_stat_row = self._add_single_dart_stat_row()
         self._create_bindings()
 
@@ -506,7 +634,7 @@ class ThrowHistoryTable(ttk.LabelFrame):
         table.grid(row=0, column=0, padx=10, pady=(10,0),
                                 sticky="ns")
         self._configure_table_columns(table, columns)
-        self._add_table_scrollbar(self, table)
+        self.scrollbar = self._add_table_scrollbar(self, self._on_scrollbar)
         return table
     
     def _add_single_dart_stat_row(self) -> ttk.Treeview:
@@ -542,16 +670,121 @@ class ThrowHistoryTable(ttk.LabelFrame):
             table.column(column, width=80, anchor=tk.CENTER)
 
     @staticmethod
-    def _add_table_scrollbar(parent: tk.Widget, table: ttk.Treeview) -> None:
-        """Create a scrollbar for the table"""
-        scrollbar = ttk.Scrollbar(parent, orient=tk.VERTICAL,
-                                  command=table.yview)
-        table.configure(yscroll=scrollbar.set)
+    def _add_table_scrollbar(parent: tk.Widget, command) -> ttk.Scrollbar:
+        """Create a scrollbar for the table. It scrolls the session model,
+        not the Treeview, so it calls command instead of table.yview"""
+        scrollbar = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=command)
         scrollbar.grid(row=0, column=1, sticky='ns')
+        scrollbar.set(0, 1)
+        return scrollbar
 
     def _create_bindings(self) -> None:
         """Bind callout functions to events"""
         self.throw_history_table.bind("<Double-1>", self._edit_cell)
+        self.throw_history_table.bind("<Configure>", self._on_resize)
+        # Windows / macOS and X11 mouse wheel events
+        self.throw_history_table.bind("<MouseWheel>", lambda event:
+                                      self._on_mousewheel(-event.delta))
+        self.throw_history_table.bind("<Button-4>", lambda event:
+                                      self._on_mousewheel(-1))
+        self.throw_history_table.bind("<Button-5>", lambda event:
+                                      self._on_mousewheel(1))
+
+    @property
+    def records(self) -> SessionRecords:
+        """The session model shown by the table"""
+        return self.master.session.records
+
+    def _set_slot_count(self, count: int) -> None:
+        """Create or delete slots, so there are count of them"""
+        table = self.throw_history_table
+        while len(self.slots) < count:
+            slot = table.insert("", tk.END, values=("", "", "", "", ""))
+            table.detach(slot)
+            self.slots.append(slot)
+        if len(self.slots) > count:
+            table.delete(*self.slots[count:])
+            del self.slots[count:]
+        self.attached_slots = min(self.attached_slots, count)
+
+    def _on_resize(self, event=None) -> None:
+        """Fit the number of slots to the height of the table.
+        The row height is measured on the first slot, so it needs a visit
+        shown on the displayed table"""
+        self._resize_pending = False
+        if not self.attached_slots:
+            return
+        bbox = self.throw_history_table.bbox(self.slots[0])
+        if not bbox:
+            return
+        self._measured = True
+        _, row_y, _, row_height = bbox
+        visible_rows = max(1, (self.throw_history_table.winfo_height() - row_y)
+                           // row_height)
+        if visible_rows != len(self.slots):
+            self._set_slot_count(visible_rows)
+            self.scroll_to(self.offset)
+
+    def _on_scrollbar(self, action: str, amount: str, unit: str = "") -> None:
+        """Handle the moveto and scroll commands of the scrollbar"""
+        if action == "moveto":
+            self.scroll_to(round(float(amount) * len(self.records)))
+        elif unit == "pages":
+            self.scroll_to(self.offset + int(amount) * len(self.slots))
+        else:
+            self.scroll_to(self.offset + int(amount))
+
+    def _on_mousewheel(self, delta: int) -> str:
+        """Scroll 3 rows per wheel step"""
+        self.scroll_to(self.offset + (3 if delta > 0 else -3))
+        return "break"
+
+    def scroll_to(self, offset: int) -> None:
+        """Show the visits starting at offset, limited to the valid range"""
+        max_offset = max(0, len(self.records) - len(self.slots))
+        offset = min(max(0, offset), max_offset)
+        if offset != self.offset:
+            # The popup and the selection belong to the visit of a slot
+            self._destroy_entry_popup()
+            self.throw_history_table.selection_remove(
+                self.throw_history_table.selection())
+        self.offset = offset
+        self._render()
+
+    def _render(self) -> None:
+        """Fill the slots with the visits from offset on"""
+        table = self.throw_history_table
+        records = self.records
+        shown = min(len(self.slots), len(records) - self.offset)
+        for i in range(shown):
+            record = records[self.offset + i]
+            if i >= self.attached_slots:
+                table.move(self.slots[i], "", i)
+            table.item(self.slots[i], values=(
+                record.visit_id,
+                record.throw_1,
+                record.throw_2,
+                record.throw_3,
+                record.total,
+            ))
+        if shown < self.attached_slots:
+            table.detach(*self.slots[shown:self.attached_slots])
+        self.attached_slots = shown
+        if records:
+            self.scrollbar.set(self.offset / len(records),
+                               (self.offset + shown) / len(records))
+        else:
+            self.scrollbar.set(0, 1)
+        if shown and not self._measured and not self._resize_pending:
+            self._resize_pending = True
+            self.after_idle(self._on_resize)
+
+    def _destroy_entry_popup(self) -> None:
+        """Destroy the EntryPopup, if there's one"""
+        try:
+            self.entry_popup.destroy()
+        except AttributeError:
+            pass
         
     def _edit_cell(self, event, row=None, column=None) -> None:
         """Open a PopupEntry field above the TreeView cell that was 
@@ -559,10 +792,7 @@ class ThrowHistoryTable(ttk.LabelFrame):
         will be ignored and therefore not editable."""
         
         # Destroy existing popup, if there's one
-        try: 
-            self.entry_popup.destroy()
-        except AttributeError:
-            pass
+        self._destroy_entry_popup()
         
         if not row:
             row = self.throw_history_table.identify_row(event.y)
@@ -587,40 +817,21 @@ class ThrowHistoryTable(ttk.LabelFrame):
         self.entry_popup.place(x=x, y=y+pady, width=width, height=height, anchor="w")
 
     def add_record(self, record: ThrowRecord) -> None:
-        """Render one typed record into the TreeView."""
-        item_id = self.throw_history_table.insert(
-            "", tk.END,
-            values=(
-                record.visit_id,
-                record.throw_1,
-                record.throw_2,
-                record.throw_3,
-                record.total,
-            )
-        )
-        self.row_items[record.visit_id] = item_id
-        self.throw_history_table.yview_moveto(1)
+        """Show a new record at the next refresh by scrolling to the end"""
+        self._pending_offset = record.visit_id
 
-    def update_record(self, record: ThrowRecord) -> None:
-        """Refresh an existing displayed record from the session model."""
-        item_id = self.row_items.get(record.visit_id)
-        if item_id is None:
-            return
-        self.throw_history_table.item(
-            item_id,
-            values=(
-                record.visit_id,
-                record.throw_1,
-                record.throw_2,
-                record.throw_3,
-                record.total,
-            ),
-        )
+    def refresh(self) -> None:
+        """Render the visible rows of the session model, e.g. after records
+        were added or edited"""
+        offset, self._pending_offset = self._pending_offset, None
+        self.scroll_to(self.offset if offset is None else offset)
 
     def clear_table(self) -> None:
         """Clear all entries from TreeView"""
-        self.throw_history_table.delete(*self.throw_history_table.get_children())
-        self.row_items.clear()
+        self._destroy_entry_popup()
+        self.offset = 0
+        self._pending_offset = None
+        self._render()
 
 
 class EntryPopup(ScoreEntry):
@@ -2,6 +2,7 @@ import os
 import tkinter as tk
 import tkinter.ttk as ttk
 import config
+from db.database import DURABLE_SYNCHRONOUS
 from pathlib import Path
 from tkinter import filedialog
 from ..constants import FONT_TITLE, COLOR_FONT_TITLE
@@ -25,15 +26,17 @@ class PageTitle(ttk.Frame):
 class Settings(ttk.Frame):
     """Settings page for configuring database backup preferences."""
 
-    def __init__(self, parent, *args, **kwargs) -> None:
+    def __init__(self, parent, db, *args, **kwargs) -> None:
         """Initialize the settings page and load persisted values into the form."""
         super().__init__(parent, *args, **kwargs)
+        self.db = db
         self.config = config.load_config()
         if not self.config.has_section("database"):
             self.config.add_section("database")
 
         self.backup_var = tk.StringVar()
         self.keep_count_var = tk.StringVar()
+        self.performance_vars: dict[str, tk.StringVar] = {}
         self._saved_backup_path = ""
         self._saved_keep_count = ""
         self._gui_created = False
@@ -93,8 +96,10 @@ class Settings(ttk.Frame):
         self.keep_count_spinbox.grid(row=1, column=1, sticky="w", pady=5)
         self.keep_count_spinbox.bind("<Return>", self._on_enter_pressed)
 
+        self._create_performance_frame()
+
         actions = ttk.Frame(self)
-        actions.grid(row=2, column=0, sticky="ew", padx=10, pady=(0, 10))
+        actions.grid(row=3, column=0, sticky="ew", padx=10, pady=(0, 10))
         actions.columnconfigure(0, weight=1)
 
         self.reset_btn = ttk.Button(actions, text="Reset to Default", command=self.reset_to_defaults)
@@ -111,6 +116,52 @@ class Settings(ttk.Frame):
         self.bind("<Return>", self._on_enter_pressed)
         self._gui_created = True
 
+    def _create_performance_frame(self) -> None:
+        """Create a read-only view of the connection pragmas in effect."""
+        self.performance_frame = ttk.LabelFrame(
+            self, text="Database / Performance (in effect)", padding=10
+        )
+        self.performance_frame.grid(row=2, column=0, sticky="nsew", padx=10, pady=(0, 10))
+        self.performance_frame.columnconfigure(1, weight=1)
+
+        labels = {
+            "journal_mode": "Journal Mode:",
+            "synchronous": "Synchronous:",
+            "cache_size": "Cache Size:",
+            "mmap_size": "Memory Map Size:",
+            "temp_store": "Temp Store:",
+        }
+        for row, (pragma, label_text) in enumerate(labels.items()):
+            ttk.Label(self.performance_frame, text=label_text).grid(
+                row=row, column=0, sticky="w", padx=(0, 10), pady=2
+            )
+            value_var = tk.StringVar()
+            ttk.Label(self.performance_frame, textvariable=value_var).grid(
+                row=row, column=1, sticky="w", pady=2
+            )
+            self.performance_vars[pragma] = value_var
+
+        ttk.Label(
+            self.performance_frame,
+            text=f"Edit the [{config.PERFORMANCE_SECTION}] section of config.ini "
+                 "and restart the application to change these values. "
+                 f"Synchronous is at least {DURABLE_SYNCHRONOUS}, so saved "
+                 "visits survive a crash or a power loss.",
+            wraplength=500,
+        ).grid(row=len(labels), column=0, columnspan=2, sticky="w", pady=(6, 0))
+        self._load_performance_values()
+
+    def _load_performance_values(self) -> None:
+        """Show the pragma values of the live database connection."""
+        if self.db.db_conn is None:
+            return
+        for pragma, value in self.db.get_performance_settings().items():
+            self.performance_vars[pragma].set(value)
+
+    def on_show(self) -> None:
+        """Refresh the displayed performance values when the page is shown."""
+        self._load_performance_values()
+
     def _normalize_path(self, value: str) -> str:
         """Return a trimmed, normalized POSIX-style path string when possible."""
         value = (value or "").strip()
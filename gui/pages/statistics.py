@@ -1,13 +1,16 @@
 from __future__ import annotations
-import matplotlib.pyplot as plt
 import tkinter as tk
 import tkinter.ttk as ttk
+from concurrent.futures import Future, ThreadPoolExecutor
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from engine.trend import DEFAULT_MAX_POINTS
+from gui.widgets.custom_popup import CustomPopup
 from ..constants import (
     FONT_TITLE,
     COLOR_FONT_TITLE,
 )
 from .plot_strategies import (
+    PlotFigure,
     PlotStrategy,
     ThreeDartAvg,
     NrOfSessions,
@@ -53,9 +56,7 @@ class StatPage(ttk.Frame):
         """Refresh plot based on current selector values."""
         sampling_rule = PlotSelector.sampling_rules[self.plot_selector.time_scale.get()]
         plot_strategy = PlotSelector.plot_strategies[self.plot_selector.plot_type.get()]
-        plot = Plot(self.db, plot_strategy, sampling_rule)
-        self.plot_canvas.add_plot(plot)
-        self.plot_canvas.canvas.draw()
+        self.plot_canvas.show_plot(plot_strategy, sampling_rule)
 
     def on_show(self) -> None:
         """Refresh page data when page is shown."""
@@ -122,10 +123,7 @@ class PlotSelector(ttk.Frame):
         """Update plot according to selected ComboBox items"""
         sampling_rule = PlotSelector.sampling_rules[self.time_scale.get()]
         plot_strategy = PlotSelector.plot_strategies[self.plot_type.get()]
-
-        plot = Plot(self.parent.db, plot_strategy, sampling_rule)
-        self.parent.plot_canvas.add_plot(plot)
-        self.parent.plot_canvas.canvas.draw()
+        self.parent.plot_canvas.show_plot(plot_strategy, sampling_rule)
 
     def create_bindings(self) -> None:
         """Create key event bindings for drop downs"""
@@ -134,47 +132,113 @@ class PlotSelector(ttk.Frame):
 
 
 class PlotCanvas(ttk.Frame):
-    """Frame for Plot"""
+    """Frame for Plot. Every type of plot has one figure, which is
+    created when the plot is shown first and then only updated.
+
+    The data of a plot is loaded on a worker thread and handed back to
+    the Tk loop by polling with after(). Every request gets a new
+    generation, results of older generations are dropped.
+    The first plot is requested by StatPage.on_show."""
 
-    default_strategy = AveragesAndSessions()
+    LOAD_POLL_MS = 50
 
     def __init__(self, parent, *args, **kwargs) -> None:
-        """Construct PlotCanvas and create default average plot"""
+        """Construct PlotCanvas, empty until a plot is shown"""
         super().__init__(parent, *args, **kwargs)
         self.parent = parent
+        self.busy_indicator = ttk.Progressbar(self, mode="indeterminate")
         self.canvas = self._create_canvas()
-        self.plot = Plot(self.parent.db, PlotCanvas.default_strategy, "MS")
-        if self.plot.fig:
-            self.add_plot(self.plot)
-        
+        self.figures: dict[type, PlotFigure] = {}
+        self.plot: PlotFigure = None
+        self.executor = ThreadPoolExecutor(max_workers=1,
+                                           thread_name_prefix="plot-loader")
+        self.generation = 0
+        self.pending_load: Future = None
+
     def _create_canvas(self) -> FigureCanvasTkAgg:
         """Create canvas widget with matplotlib backend"""
         canvas = FigureCanvasTkAgg(None, master=self)
         canvas.get_tk_widget().pack(padx=10, pady=10, 
                                     side=tk.TOP, fill=tk.BOTH, expand=True)
         return canvas
-        
-    def add_plot(self, plot: "Plot") -> None:
-        """Add Figure to canvas"""
-        old_fig = self.canvas.figure
 
+    def show_plot(self, strategy: PlotStrategy, sampling_rule: str) -> None:
+        """Load the data of strategy resampled by sampling_rule in the
+        background and show the plot when it is ready"""
+        self.generation += 1
+        if self.pending_load is not None:
+            # Only cancels a load that has not started, a running one is
+            # dropped when it is done
+            self.pending_load.cancel()
+        self.pending_load = self.executor.submit(strategy.load_data, self.parent.db,
+                                                 sampling_rule, self.plot_width())
+        self._set_busy(True)
+        self.after(self.LOAD_POLL_MS, self._poll_load, self.pending_load,
+                   self.generation, strategy, sampling_rule)
+
+    def plot_width(self) -> int:
+        """Return the width of the plot in pixels, the resolution of the
+        trend curves"""
+        width = self.canvas.get_tk_widget().winfo_width()
+        # The widget is 1 pixel wide until it is shown
+        if width <= 1:
+            return DEFAULT_MAX_POINTS
+        return width
+
+    def _poll_load(self, load: Future, generation: int,
+                   strategy: PlotStrategy, sampling_rule: str) -> None:
+        """Wait for the load of generation and show its plot"""
+        if generation != self.generation:
+            return
+        if not load.done():
+            self.after(self.LOAD_POLL_MS, self._poll_load, load, generation,
+                       strategy, sampling_rule)
+            return
+        self.pending_load = None
+        self._set_busy(False)
+        error = load.exception()
+        if error is not None:
+            CustomPopup(
+                popup_type="error",
+                title="Error",
+                message=f"Failed to load the plot data!\n{error}"
+            )
+            return
+        plot = self.figures.get(type(strategy))
+        if plot is None:
+            plot = strategy.create_figure()
+            self.figures[type(strategy)] = plot
+        strategy.update_figure(plot, load.result(), sampling_rule)
+        self._set_figure(plot)
+        self.canvas.draw_idle()
+
+    def _set_busy(self, busy: bool) -> None:
+        """Show or hide the busy indicator"""
+        if busy:
+            if not self.busy_indicator.winfo_manager():
+                self.busy_indicator.pack(side=tk.TOP, fill=tk.X, padx=10,
+                                         before=self.canvas.get_tk_widget())
+                self.busy_indicator.start()
+        else:
+            self.busy_indicator.stop()
+            self.busy_indicator.pack_forget()
+
+    def _set_figure(self, plot: PlotFigure) -> None:
+        """Put the figure of plot on the canvas"""
+        if plot is self.plot:
+            return
+        old_fig = self.canvas.figure
         if old_fig is not None:
-            fig_size = old_fig.get_size_inches()
-            plot.fig.set_size_inches(fig_size)
-            plt.close(old_fig)
-            
+            plot.fig.set_size_inches(old_fig.get_size_inches(), forward=False)
         self.canvas.figure = plot.fig
+        plot.fig.set_canvas(self.canvas)
         self.plot = plot
 
-
-class Plot():
-    """Container for plot"""
-    def __init__(self, db: DataBase, strategy: PlotStrategy, sampling_rule: str) -> None:
-        """Create Plot according to the set Strategy"""
-        self.strategy = strategy
-        self.fig = None
-        self.fig, self.ax = self.strategy.build_plot(db, sampling_rule)
-        self.fig_size = self.fig.get_size_inches()
+    def destroy(self) -> None:
+        """Stop the plot loads and destroy the frame"""
+        self.generation += 1
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        super().destroy()
 
 
 if __name__ == "__main__":
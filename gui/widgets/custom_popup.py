@@ -13,16 +13,24 @@ class CustomPopup(tk.Toplevel):
     instead of application, even though parent kwarg was set"""
     VALID_POPUP_TYPES = {"information", "warning", "error", "question"}
 
-    def __init__(self, *, popup_type="information", title="", message="", callback_fct=None, **kwargs) -> None:
+    def __init__(self, *, popup_type="information", title="", message="", callback_fct=None,
+                 cancel_fct=None, ok_text="OK", cancel_text="Cancel", extra_buttons=None,
+                 **kwargs) -> None:
         """Construct the CustomPopup widget and make it a modal window.
-        Main window remains inactive until this one closed."""
+        Main window remains inactive until this one closed.
+        cancel_fct is called, when the Cancel button of a question is clicked.
+        extra_buttons = {text: fct} adds buttons before the OK button"""
         super().__init__(**kwargs)
         self.message = message
+        self.ok_text = ok_text
+        self.cancel_text = cancel_text
+        self.extra_buttons = extra_buttons or {}
         if popup_type not in self.VALID_POPUP_TYPES:
             popup_type = "information"
         self.popup_type = popup_type
         self.title(title)
         self.callback_fct = callback_fct
+        self.cancel_fct = cancel_fct
         self.resizable(False, False)
         self._set_geometry()
         self._construct_widgets()
@@ -34,7 +42,7 @@ class CustomPopup(tk.Toplevel):
 
     def _set_geometry(self) -> None:
         """Determine widget target position and setup geometry"""
-        width = 350
+        width = 350 + 90 * len(self.extra_buttons)
         height = 120
         pos_x = self.master.winfo_x() + GEOMETRY_W // 2 - width // 2
         pos_y = self.master.winfo_y() + GEOMETRY_H // 2 - height // 2
@@ -50,11 +58,17 @@ class CustomPopup(tk.Toplevel):
         label = tk.Label(self, text=self.message, background="white", 
                          font=FONT_DEFAULT, wraplength=300, justify="left")
         label.grid(row=0, column=1, rowspan=2, columnspan=2, sticky="news")
-        ok = ttk.Button(self, text="OK", command=self._callback)
-        ok.grid(row=2, column=1, padx=(10, 10), sticky="e")
+        button_frame = ttk.Frame(self)
+        button_frame.grid(row=2, column=1, columnspan=2, padx=(10, 10), sticky="e")
+        for text, fct in self.extra_buttons.items():
+            button = ttk.Button(button_frame, text=text,
+                                command=lambda fct=fct: self._extra_button(fct))
+            button.pack(side="left", padx=(0, 10))
+        ok = ttk.Button(button_frame, text=self.ok_text, command=self._callback)
+        ok.pack(side="left")
         if self.popup_type == "question":
-            cancel = ttk.Button(self, text="Cancel", command=self.destroy)
-            cancel.grid(row=2, column=2, padx=(0, 10), sticky="e") 
+            cancel = ttk.Button(button_frame, text=self.cancel_text, command=self._cancel)
+            cancel.pack(side="left", padx=(10, 0))
         self.bind("<Escape>", lambda e: self.destroy())
         ok.focus()
 
@@ -65,6 +79,17 @@ class CustomPopup(tk.Toplevel):
         if self.callback_fct is not None:
             self.callback_fct()
 
+    def _extra_button(self, fct) -> None:
+        """Callback function for the extra buttons."""
+        self.destroy()
+        fct()
+
+    def _cancel(self) -> None:
+        """Callback function for the Cancel button."""
+        self.destroy()
+        if self.cancel_fct is not None:
+            self.cancel_fct()
+
 
 if __name__ == "__main__":
     pass
\ No newline at end of file
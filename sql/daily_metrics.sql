@@ -0,0 +1,10 @@
+-- Query for all per-day metrics used by the plots
+SELECT date,
+       games AS nr_of_games,
+       visits,
+       score_sum AS overall_score,
+       visits * 3 AS darts_thrown,
+       visits_180,
+       trebleless
+FROM daily_stats
+ORDER BY date;
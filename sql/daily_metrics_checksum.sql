@@ -0,0 +1,13 @@
+-- Checksum of the per-day metrics before a date, to detect changes of
+-- days that were loaded already. The weighted sum also changes if a
+-- value moves from one day to another
+SELECT COUNT(*),
+       COALESCE(SUM(games), 0),
+       COALESCE(SUM(visits), 0),
+       COALESCE(SUM(score_sum), 0),
+       COALESCE(SUM(visits_180), 0),
+       COALESCE(SUM(trebleless), 0),
+       COALESCE(SUM((games + visits + score_sum + visits_180 + trebleless)
+                    * (CAST(STRFTIME('%s', date) AS INTEGER) / 86400)), 0)
+FROM daily_stats
+WHERE date < ?;
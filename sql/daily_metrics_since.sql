@@ -0,0 +1,11 @@
+-- Query for the per-day metrics from a date on (the trailing days)
+SELECT date,
+       games AS nr_of_games,
+       visits,
+       score_sum AS overall_score,
+       visits * 3 AS darts_thrown,
+       visits_180,
+       trebleless
+FROM daily_stats
+WHERE date >= ?
+ORDER BY date;
@@ -0,0 +1,5 @@
+-- Index for joining throws to games
+CREATE INDEX IF NOT EXISTS idx_throws_game_id ON throws (game_id);
+
+-- Index for filtering and grouping games by date
+CREATE INDEX IF NOT EXISTS idx_games_game_start ON games (game_start);
@@ -0,0 +1,30 @@
+-- Per-day rollup of games and throws, maintained when a session is saved
+CREATE TABLE IF NOT EXISTS daily_stats (
+    date TEXT PRIMARY KEY,
+    games INT NOT NULL DEFAULT 0,
+    visits INT NOT NULL DEFAULT 0,
+    score_sum INT NOT NULL DEFAULT 0,
+    visits_180 INT NOT NULL DEFAULT 0,
+    trebleless INT NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+
+-- Fill the rollup from the existing history
+INSERT INTO daily_stats (date, games, visits, score_sum, visits_180, trebleless)
+SELECT STRFTIME("%Y-%m-%d", games.game_start) AS date,
+       COUNT(DISTINCT games.game_id),
+       COUNT(throws.throw_id),
+       COALESCE(SUM(throws.sum), 0),
+       SUM(CASE
+              WHEN (throw_1='T20' AND throw_2='T20' AND throw_3='T20')
+                   OR (throw_1='T19' AND throw_2='T19' AND throw_3='T19')
+              THEN 1
+              ELSE 0
+       END),
+       SUM(CASE
+              WHEN throw_1 NOT LIKE 'T%' AND throw_2 NOT LIKE 'T%' AND throw_3 NOT LIKE 'T%'
+              THEN 1
+              ELSE 0
+       END)
+FROM games
+LEFT JOIN throws ON games.game_id=throws.game_id
+GROUP BY date;
@@ -0,0 +1,63 @@
+-- Darts are stored as one small integer: multiplier * 32 + segment
+--   segment: 1-20, 25 for the bull, 0 for no score
+--   multiplier: 1 single, 2 double, 3 treble
+--   special entries without a score: 0 (no score), 30 (B), 31 (R)
+-- The value of a dart is (code & 31) * (code >> 5)
+CREATE TABLE IF NOT EXISTS darts (
+    code INTEGER PRIMARY KEY,
+    token TEXT NOT NULL UNIQUE
+);
+
+INSERT INTO darts (code, token)
+WITH RECURSIVE segment(n) AS (
+    SELECT 1
+    UNION ALL
+    SELECT n + 1 FROM segment WHERE n < 20
+)
+SELECT 32 + n, CAST(n AS TEXT) FROM segment
+UNION ALL
+SELECT 64 + n, 'D' || n FROM segment
+UNION ALL
+SELECT 96 + n, 'T' || n FROM segment
+UNION ALL
+VALUES (0, '0'), (30, 'B'), (31, 'R'), (57, '25'), (89, '50');
+
+-- Rebuild throws with integer darts and generated dart values
+CREATE TABLE throws_new (
+    throw_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    game_id INT,
+    dart_1 INT NOT NULL,
+    dart_2 INT NOT NULL,
+    dart_3 INT NOT NULL,
+    sum INT NOT NULL,
+    value_1 INT GENERATED ALWAYS AS ((dart_1 & 31) * (dart_1 >> 5)) VIRTUAL,
+    value_2 INT GENERATED ALWAYS AS ((dart_2 & 31) * (dart_2 >> 5)) VIRTUAL,
+    value_3 INT GENERATED ALWAYS AS ((dart_3 & 31) * (dart_3 >> 5)) VIRTUAL,
+    FOREIGN KEY(game_id) REFERENCES games(game_id) ON DELETE CASCADE
+);
+
+INSERT INTO throws_new (throw_id, game_id, dart_1, dart_2, dart_3, sum)
+SELECT throw_id,
+       game_id,
+       (SELECT code FROM darts WHERE token = UPPER(throws.throw_1)),
+       (SELECT code FROM darts WHERE token = UPPER(throws.throw_2)),
+       (SELECT code FROM darts WHERE token = UPPER(throws.throw_3)),
+       sum
+FROM throws;
+
+DROP TABLE throws;
+ALTER TABLE throws_new RENAME TO throws;
+CREATE INDEX IF NOT EXISTS idx_throws_game_id ON throws (game_id);
+
+-- Text form of the darts for display
+CREATE VIEW IF NOT EXISTS throws_text AS
+SELECT throws.throw_id,
+       throws.game_id,
+       dart_1.token AS throw_1,
+       dart_2.token AS throw_2,
+       dart_3.token AS throw_3,
+       throws.sum
+FROM throws
+JOIN darts AS dart_1 ON dart_1.code = throws.dart_1
+JOIN darts AS dart_2 ON dart_2.code = throws.dart_2
+JOIN darts AS dart_3 ON dart_3.code = throws.dart_3;
@@ -0,0 +1,3 @@
+-- Time a visit was entered, so a session that was never finished can be
+-- finished at its last visit. NULL for visits saved before this column
+ALTER TABLE throws ADD COLUMN thrown_at TEXT;
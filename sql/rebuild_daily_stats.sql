@@ -0,0 +1,24 @@
+-- Rebuild the per-day rollup from the games and throws tables
+-- Darts are integer codes, trebles are 97-116, T20 is 116 and T19 is 115
+DELETE FROM daily_stats;
+
+INSERT INTO daily_stats (date, games, visits, score_sum, visits_180, trebleless)
+SELECT STRFTIME("%Y-%m-%d", games.game_start) AS date,
+       COUNT(DISTINCT games.game_id),
+       COUNT(throws.throw_id),
+       COALESCE(SUM(throws.sum), 0),
+       SUM(CASE
+              WHEN dart_1 = dart_2 AND dart_2 = dart_3 AND dart_1 IN (115, 116)
+              THEN 1
+              ELSE 0
+       END),
+       SUM(CASE
+              WHEN dart_1 < 96 AND dart_2 < 96 AND dart_3 < 96
+              THEN 1
+              ELSE 0
+       END)
+FROM games
+LEFT JOIN throws ON games.game_id=throws.game_id
+-- Sessions in progress are added when they are finished
+WHERE games.game_end IS NOT NULL
+GROUP BY date;